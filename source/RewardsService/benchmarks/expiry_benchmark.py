@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import argparse
+import datetime
+import time
+
+from tornado.ioloop import IOLoop
+
+from generate_customer_data import generate_customers, generate_rewards
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.expiry import PointsExpiry
+
+START = datetime.datetime(2026, 1, 1)
+
+
+def month(offset):
+    return START.replace(year=START.year + offset // 12, month=offset % 12 + 1, day=15)
+
+
+def build(customers, rewards, months, expired, days, batch_size):
+    '''
+    Every customer gets a bucket in each of the months after the first one, which are still live when sweeping,
+    and the first expired customers also get a bucket in the first month, which is what the sweep expires.
+    '''
+    storage = MemoryStorageClient(rewards, customers)
+    expiry = PointsExpiry(storage, days, batch_size)
+
+    for i, customer in enumerate(customers):
+        earned = [month(m) for m in range(0 if i < expired else 1, months + 1)]
+
+        for now in earned:
+            expiry.accrue(customer['email'], max(1, customer['points'] // len(earned)), now=now)
+
+    return expiry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time points expiry sweeps against the number of expired buckets')
+    parser.add_argument('-n', '--customers', type=int, default=200000, help='customers to generate')
+    parser.add_argument('-m', '--months', type=int, default=12, help='live monthly buckets per customer')
+    parser.add_argument('-d', '--days', type=int, default=30, help='days after the end of the month points expire')
+    parser.add_argument('-b', '--batch-size', type=int, default=1000, help='buckets expired per sweep batch')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed for the generated customers')
+    parser.add_argument('--expired', type=int, nargs='+', default=[0, 1000, 10000, 100000],
+                        help='expired bucket counts to time')
+    args = parser.parse_args()
+
+    rewards = generate_rewards(10)
+    customers = generate_customers(args.seed, 0, args.customers, rewards)
+
+    print('%d customers, %d live buckets each' % (args.customers, args.months))
+    print('%10s %14s %12s %16s' % ('expired', 'total buckets', 'sweep ms', 'us per bucket'))
+
+    for expired in args.expired:
+        expiry = build(customers, rewards, args.months, min(expired, args.customers), args.days, args.batch_size)
+        now = expiry.bucket(month(0))[1]
+
+        started = time.perf_counter()
+        IOLoop.current().run_sync(lambda: expiry.sweep_all(now=now))
+        elapsed = (time.perf_counter() - started) * 1000
+
+        total = args.customers * args.months + expired
+        per_bucket = elapsed * 1000 / expired if expired else 0
+        print('%10d %14d %12.1f %16.2f' % (expired, total, elapsed, per_bucket))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+import argparse
+import random
+import statistics
+import time
+
+from urllib.parse import urlencode
+
+from tornado.gen import coroutine
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.testing import bind_unused_port
+from tornado.web import Application
+
+from generate_customer_data import generate_customers, generate_rewards
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.coalescer import Coalescer
+from rewardsservice.email_index import EmailIndex
+from rewardsservice.events import CustomerEvents
+from rewardsservice.settings import settings
+from rewardsservice.url_patterns import url_patterns
+
+
+def start_service(customers, rewards):
+    ''' Serve the app in-process on the memory backend, so timings measure the HTTP and handler layers '''
+    storage = MemoryStorageClient(rewards, customers)
+    app = Application(url_patterns, storage=storage, coalescer=Coalescer(), events=CustomerEvents(), expiry=None,
+                      email_index=EmailIndex.from_storage(storage), **settings)
+
+    sock, port = bind_unused_port()
+    server = HTTPServer(app)
+    server.add_sockets([sock])
+
+    return 'http://127.0.0.1:%d' % port
+
+
+@coroutine
+def sequential_lookups(client, url, emails):
+    ''' Every email exists, so anything but a 200 raises rather than timing error responses '''
+    for email in emails:
+        response = yield client.fetch('%s/customers?%s' % (url, urlencode({'email': email})))
+        assert response.code == 200, response.code
+
+
+@coroutine
+def batch_lookup(client, url, emails):
+    body = urlencode([('email', email) for email in emails])
+    response = yield client.fetch('%s/customers/lookup' % url, method='POST', body=body)
+    assert response.code == 200, response.code
+
+
+@coroutine
+def timed(repeat, fn, *args):
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        yield fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return timings
+
+
+@coroutine
+def run(args):
+    rewards = generate_rewards(args.tiers)
+
+    ''' Customers are the generator's first ones for the seed, so --url works against data it loaded with it '''
+    customers = generate_customers(args.seed, 0, args.customers, rewards)
+    url = args.url or start_service(customers, rewards)
+
+    client = AsyncHTTPClient()
+    rng = random.Random(args.seed)
+
+    print('%8s %14s %14s %9s' % ('emails', 'sequential ms', 'lookup ms', 'speedup'))
+
+    for size in args.sizes:
+        emails = [c['email'] for c in rng.sample(customers, size)]
+
+        sequential = yield timed(args.repeat, sequential_lookups, client, url, emails)
+        batch = yield timed(args.repeat, batch_lookup, client, url, emails)
+
+        sequential, batch = statistics.median(sequential), statistics.median(batch)
+        print('%8d %14.1f %14.1f %8.1fx' % (size, sequential, batch, sequential / batch))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sequential GET /customers calls with POST /customers/lookup')
+    parser.add_argument('--url', help='benchmark a running service instead of an in-process one on the memory backend')
+    parser.add_argument('-n', '--customers', type=int, default=100000, help='customers to generate')
+    parser.add_argument('-t', '--tiers', type=int, default=10, help='reward tiers to generate')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed used when the data was generated')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='runs per size, the median is reported')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help='emails per lookup')
+    args = parser.parse_args()
+
+    IOLoop.current().run_sync(lambda: run(args))
+
+
+if __name__ == "__main__":
+    main()
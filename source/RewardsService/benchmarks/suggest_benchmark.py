@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from generate_customer_data import generate_email
+from rewardsservice.email_index import EmailIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure email index memory and suggestion latency')
+    parser.add_argument('-n', '--customers', type=int, default=1000000, help='emails to index')
+    parser.add_argument('-l', '--lookups', type=int, default=100000, help='suggestions to time')
+    parser.add_argument('--limit', type=int, default=10, help='suggestions per lookup')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed for the generated emails')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    emails = [generate_email(rng, i) for i in range(args.customers)]
+
+    started = time.perf_counter()
+    index = EmailIndex(emails)
+    build = time.perf_counter() - started
+
+    ''' The array of pointers plus the strings it holds, which is what the index keeps alive '''
+    size = sys.getsizeof(index._emails) + sum(sys.getsizeof(e) for e in index._emails)
+
+    prefixes = []
+    for email in rng.sample(emails, min(args.lookups, len(emails))):
+        prefixes.append(email[:rng.randint(1, 8)])
+
+    timings = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix, args.limit)
+        timings.append((time.perf_counter() - started) * 1000000)
+
+    timings.sort()
+
+    print('%d emails indexed in %.2fs' % (index.size, build))
+    print('memory: %.1f MB, %.1f MB per million emails' % (size / 1e6, size / index.size))
+    print('lookups: median %.2f us, p99 %.2f us, max %.2f us' % (
+        statistics.median(timings), timings[int(len(timings) * 0.99)], timings[-1]))
+
+
+if __name__ == "__main__":
+    main()
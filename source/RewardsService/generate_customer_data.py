@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+import argparse
+import gzip
+import json
+import multiprocessing
+import random
+import string
+import sys
+import time
+
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import BulkWriteError
+
+from rewardsservice.rewards import customer_rewards
+
+FIRST_NAMES = [
+    'james', 'mary', 'john', 'patricia', 'robert', 'jennifer', 'michael', 'linda', 'william', 'elizabeth',
+    'david', 'barbara', 'richard', 'susan', 'joseph', 'jessica', 'thomas', 'sarah', 'charles', 'karen',
+    'daniel', 'nancy', 'matthew', 'lisa', 'anthony', 'betty', 'mark', 'sandra', 'steven', 'ashley',
+    'paul', 'emily', 'andrew', 'donna', 'joshua', 'michelle', 'kevin', 'carol', 'brian', 'amanda',
+    'olivia', 'liam', 'emma', 'noah', 'ava', 'mia', 'lucas', 'sofia', 'ethan', 'chloe',
+]
+
+LAST_NAMES = [
+    'smith', 'johnson', 'williams', 'brown', 'jones', 'garcia', 'miller', 'davis', 'rodriguez', 'martinez',
+    'hernandez', 'lopez', 'gonzalez', 'wilson', 'anderson', 'thomas', 'taylor', 'moore', 'jackson', 'martin',
+    'lee', 'perez', 'thompson', 'white', 'harris', 'sanchez', 'clark', 'ramirez', 'lewis', 'robinson',
+    'walker', 'young', 'allen', 'king', 'wright', 'scott', 'torres', 'nguyen', 'hill', 'flores',
+]
+
+''' Weighted roughly after consumer mail provider market share, with a tail of corporate domains '''
+DOMAINS = [
+    ('gmail.com', 45), ('yahoo.com', 15), ('hotmail.com', 10), ('outlook.com', 8), ('icloud.com', 7),
+    ('aol.com', 4), ('comcast.net', 3), ('urbn.com', 2), ('example.org', 2), ('mail.co.uk', 2),
+    ('proton.me', 1), ('gmx.de', 1),
+]
+
+''' Customers are generated from one seeded generator per block, so the data only depends on the seed '''
+SEED_BLOCK = 1000
+
+''' Every tier takes 5% more off than the one below, up to this '''
+MAX_DISCOUNT = 95
+
+EMAIL_FORMATS = [
+    '{first}.{last}{n}', '{first}{last}{n}', '{f}{last}{n}', '{first}_{last}{n}', '{first}{n}', '{last}.{f}{n}',
+]
+
+
+class DuplicateCustomersError(Exception):
+    ''' Raised in a worker, so it only carries a message to survive being pickled back to the parent '''
+
+
+def tier_name(index):
+    ''' Spreadsheet style tier labels: A..Z, AA..AZ, ... '''
+    name = ''
+    index += 1
+
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = string.ascii_uppercase[remainder] + name
+
+    return name
+
+
+def generate_rewards(count):
+    return [
+        {'points': 100 * (i + 1), 'rewardName': '%d%% off purchase' % min(5 * (i + 1), MAX_DISCOUNT),
+         'tier': tier_name(i)}
+        for i in range(count)
+    ]
+
+
+def generate_email(rng, index):
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    domain = _weighted_choice(rng, DOMAINS)
+
+    ''' Names never contain digits, so the trailing customer index keeps every address unique '''
+    local = rng.choice(EMAIL_FORMATS).format(first=first, last=last, f=first[0], n=index)
+
+    return '%s@%s' % (local, domain)
+
+
+def generate_points(rng, top_points):
+    ''' Most customers sit in the lower tiers with a long tail of big spenders, some have never earned points '''
+    if rng.random() < 0.08:
+        return 0
+
+    return int(rng.lognormvariate(0, 1.1) * top_points / 4)
+
+
+def generate_customers(seed, start, end, rewards):
+    '''
+    Customers start to end, the same ones whatever the batch size or number of workers. A range starting inside a
+    block replays the draws for that block's earlier customers, which costs nothing when batches are whole blocks.
+    '''
+    top_points = rewards[-1]['points']
+    customers = []
+
+    for block in range(start // SEED_BLOCK, (end + SEED_BLOCK - 1) // SEED_BLOCK):
+        rng = random.Random('%s-%s' % (seed, block))
+
+        for i in range(block * SEED_BLOCK, min((block + 1) * SEED_BLOCK, end)):
+            email, points = generate_email(rng, i), generate_points(rng, top_points)
+
+            if i >= start:
+                customers.append(customer_rewards(email, points, rewards))
+
+    return customers
+
+
+def generate_batch(seed, batch, batch_size, total, rewards):
+    start = batch * batch_size
+
+    return generate_customers(seed, start, min(start + batch_size, total), rewards)
+
+
+def _weighted_choice(rng, weighted):
+    target = rng.random() * sum(w for _, w in weighted)
+
+    for value, weight in weighted:
+        target -= weight
+        if target < 0:
+            return value
+
+    return weighted[-1][0]
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    return open(path, mode, encoding='utf-8')
+
+
+_worker = {}
+
+
+def _init_worker(options):
+    _worker['options'] = options
+
+    if options['host']:
+        _worker['client'] = MongoClient(options['host'], options['port'])
+
+
+def _insert(customers):
+    if 'client' in _worker and customers:
+        collection = _worker['client']['Customers']['customers']
+
+        try:
+            collection.insert_many(customers, ordered=False)
+        except BulkWriteError as e:
+            ''' Unordered inserts keep going past duplicates, so the rest of the batch is in by now '''
+            duplicates = sum(1 for error in e.details.get('writeErrors', []) if error.get('code') == 11000)
+
+            if not duplicates:
+                raise
+
+            raise DuplicateCustomersError('%d of %d customers in a batch already exist, pass --drop to replace the '
+                                          'existing customers' % (duplicates, len(customers)))
+
+        ''' insert_many adds an ObjectId to every document, drop it so they can be serialized '''
+        for customer in customers:
+            customer.pop('_id', None)
+
+    return customers
+
+
+def _generate_and_insert(batch):
+    options = _worker['options']
+    customers = generate_batch(options['seed'], batch, options['batch_size'], options['customers'], options['rewards'])
+    customers = _insert(customers)
+
+    return customers if options['keep'] else len(customers)
+
+
+def _load(customers):
+    return len(_insert(customers))
+
+
+def _read_fixture(path, batch_size):
+    with _open(path, 'r') as fixture:
+        rewards = json.loads(fixture.readline())['rewards']
+        yield rewards
+
+        batch = []
+        for line in fixture:
+            batch.append(json.loads(line))
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+def prepare_database(host, port, rewards, drop):
+    client = MongoClient(host, port)
+
+    try:
+        client['Rewards'].rewards.delete_many({})
+        client['Rewards'].rewards.insert_many([dict(r) for r in rewards])
+
+        customers = client['Customers'].customers
+        if drop:
+            customers.drop()
+
+        ''' Lookups, upserts and deletes are all by email, and the tier sort uses points '''
+        customers.create_index([('email', ASCENDING)], unique=True)
+        client['Rewards'].rewards.create_index([('points', ASCENDING)])
+        client['Accruals'].accruals.create_index([('expiresAt', ASCENDING)])
+        client['Accruals'].accruals.create_index([('email', ASCENDING), ('bucket', ASCENDING)], unique=True)
+    finally:
+        client.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic customer rewards data for tests and benchmarks')
+    parser.add_argument('-n', '--customers', type=int, default=1000000, help='number of customers to generate')
+    parser.add_argument('-t', '--tiers', type=int, default=10, help='number of reward tiers to generate')
+    parser.add_argument('-s', '--seed', type=int, default=0, help='seed for the random generator')
+    parser.add_argument('-b', '--batch-size', type=int, default=10000,
+                        help='documents per insert_many call, multiples of %d generate fastest' % SEED_BLOCK)
+    parser.add_argument('-w', '--workers', type=int, default=multiprocessing.cpu_count(), help='parallel workers')
+    parser.add_argument('-o', '--output', help='write the generated data to a fixture file (.jsonl or .jsonl.gz)')
+    parser.add_argument('-l', '--load', help='insert a fixture file written with --output instead of generating')
+    parser.add_argument('--host', default='mongodb', help='mongo host, pass an empty string to skip inserting')
+    parser.add_argument('--port', type=int, default=27017, help='mongo port')
+    parser.add_argument('--drop', action='store_true', help='drop existing customers before inserting')
+
+    return parser.parse_args(argv)
+
+
+def generate(args):
+    ''' Generate, or load with --load, and insert the customers, returns how many there were '''
+    started = time.time()
+    count = 0
+
+    if args.load:
+        fixture = _read_fixture(args.load, args.batch_size)
+        rewards = next(fixture)
+        batches = fixture
+        work = _load
+    else:
+        rewards = generate_rewards(args.tiers)
+        batches = range((args.customers + args.batch_size - 1) // args.batch_size)
+        work = _generate_and_insert
+
+    if args.host:
+        print('Preparing rewards and customer indexes in mongo')
+        prepare_database(args.host, args.port, rewards, args.drop)
+
+    options = {
+        'host': args.host, 'port': args.port, 'seed': args.seed, 'batch_size': args.batch_size,
+        'customers': args.customers, 'rewards': rewards, 'keep': bool(args.output),
+    }
+
+    output = _open(args.output, 'w') if args.output and not args.load else None
+
+    try:
+        if output:
+            output.write(json.dumps({'rewards': rewards}) + '\n')
+
+        pool = multiprocessing.Pool(max(1, args.workers), _init_worker, (options,))
+
+        try:
+            ''' imap keeps batches in order, so fixture files are identical for the same seed '''
+            for result in pool.imap(work, batches):
+                if output:
+                    output.writelines(json.dumps(c, sort_keys=True) + '\n' for c in result)
+
+                count += result if isinstance(result, int) else len(result)
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        if output:
+            output.close()
+
+    print('Generated %d customers across %d tiers in %.1fs' % (count, len(rewards), time.time() - started))
+
+    return count
+
+
+def main():
+    try:
+        generate(parse_args())
+    except DuplicateCustomersError as e:
+        sys.exit('error: %s' % e)
+
+
+if __name__ == "__main__":
+    main()
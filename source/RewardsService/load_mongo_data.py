@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING
 
 
 def main():
@@ -7,18 +7,26 @@ def main():
     db = client["Rewards"]
 
     print("Removing and reloading rewards in mongo")
-    db.rewards.remove()
-    db.rewards.insert({"points": 100, "rewardName": "5% off purchase", "tier": "A"})
-    db.rewards.insert({"points": 200, "rewardName": "10% off purchase", "tier": "B"})
-    db.rewards.insert({"points": 300, "rewardName": "15% off purchase", "tier": "C"})
-    db.rewards.insert({"points": 400, "rewardName": "20% off purchase", "tier": "D"})
-    db.rewards.insert({"points": 500, "rewardName": "25% off purchase", "tier": "E"})
-    db.rewards.insert({"points": 600, "rewardName": "30% off purchase", "tier": "F"})
-    db.rewards.insert({"points": 700, "rewardName": "35% off purchase", "tier": "G"})
-    db.rewards.insert({"points": 800, "rewardName": "40% off purchase", "tier": "H"})
-    db.rewards.insert({"points": 900, "rewardName": "45% off purchase", "tier": "I"})
-    db.rewards.insert({"points": 1000, "rewardName": "50% off purchase", "tier": "J"})
+    db.rewards.delete_many({})
+    db.rewards.insert_many([
+        {"points": 100, "rewardName": "5% off purchase", "tier": "A"},
+        {"points": 200, "rewardName": "10% off purchase", "tier": "B"},
+        {"points": 300, "rewardName": "15% off purchase", "tier": "C"},
+        {"points": 400, "rewardName": "20% off purchase", "tier": "D"},
+        {"points": 500, "rewardName": "25% off purchase", "tier": "E"},
+        {"points": 600, "rewardName": "30% off purchase", "tier": "F"},
+        {"points": 700, "rewardName": "35% off purchase", "tier": "G"},
+        {"points": 800, "rewardName": "40% off purchase", "tier": "H"},
+        {"points": 900, "rewardName": "45% off purchase", "tier": "I"},
+        {"points": 1000, "rewardName": "50% off purchase", "tier": "J"},
+    ])
     print("Rewards loaded in mongo")
 
+    # Expiry sweeps look buckets up by expiry date, accruals add to a customer's bucket for the month
+    accruals = client["Accruals"].accruals
+    accruals.create_index([("expiresAt", ASCENDING)])
+    accruals.create_index([("email", ASCENDING), ("bucket", ASCENDING)], unique=True)
+    print("Accrual indexes created in mongo")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
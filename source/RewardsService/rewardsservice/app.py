@@ -7,6 +7,11 @@ import tornado.web
 
 from tornado.options import options
 
+from rewardsservice.clients import create_storage
+from rewardsservice.coalescer import Coalescer
+from rewardsservice.email_index import EmailIndex
+from rewardsservice.events import CustomerEvents
+from rewardsservice.expiry import PointsExpiry
 from rewardsservice.settings import settings
 from rewardsservice.url_patterns import url_patterns
 
@@ -15,19 +20,46 @@ class App(tornado.web.Application):
     def __init__(self, urls):
         self.logger = logging.getLogger(self.__class__.__name__)
 
-        tornado.web.Application.__init__(self, urls, **settings)
+        # Handlers share these through the application settings, the unit tests pass their own the same way
+        storage = create_storage(options)
+        expiry = PointsExpiry(storage, options.points_expiry_days, options.expiry_sweep_batch) \
+            if options.points_expiry_days else None
 
-app = App(url_patterns)
+        coalescer = Coalescer(options.coalesce_ttl, max_results=options.coalesce_max_results)
+
+        # Build the autocomplete index before taking requests rather than on the first one
+        email_index = EmailIndex.from_storage(storage)
+
+        tornado.web.Application.__init__(self, urls, storage=storage, coalescer=coalescer, events=CustomerEvents(),
+                                         expiry=expiry, email_index=email_index, **settings)
+
+
+def expire_points(app):
+    def on_update(customers):
+        app.settings['coalescer'].forget('customers')
+
+        for customer in customers:
+            app.settings['events'].publish('update', customer)
+
+    return app.settings['expiry'].sweep_all(on_update)
 
 
 def main():
     logger = logging.getLogger()
     tornado.options.parse_command_line()
+
+    app = App(url_patterns)
+    logger.info('Indexed {} customer emails'.format(app.settings['email_index'].size))
+
     http_server = tornado.httpserver.HTTPServer(app, xheaders=True)
     http_server.listen(options.port)
 
     logger.info('Tornado server started on port {}'.format(options.port))
 
+    if app.settings['expiry']:
+        tornado.ioloop.PeriodicCallback(lambda: expire_points(app), options.expiry_sweep_interval * 1000).start()
+        logger.info('Expiring points {} days after the month they were earned'.format(options.points_expiry_days))
+
     try:
         tornado.ioloop.IOLoop.instance().start()
     except KeyboardInterrupt:
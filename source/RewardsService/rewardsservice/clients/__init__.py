@@ -0,0 +1,15 @@
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.clients.mongo_client import MongoStorageClient
+
+STORAGE_BACKENDS = {
+    'memory': MemoryStorageClient,
+    'mongo': MongoStorageClient,
+}
+
+
+def create_storage(options):
+    ''' Build the client for the backend picked with --storage, the application shares it between requests '''
+    if options.storage not in STORAGE_BACKENDS:
+        raise ValueError('Unknown storage backend %s' % options.storage)
+
+    return STORAGE_BACKENDS[options.storage].from_options(options)
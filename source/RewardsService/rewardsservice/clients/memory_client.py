@@ -0,0 +1,137 @@
+import bisect
+import heapq
+import itertools
+import threading
+
+from rewardsservice.clients.storage_client import StorageClient
+from rewardsservice.rewards import DEFAULT_REWARDS
+
+
+class MemoryStorageClient(StorageClient):
+    ''' Process local storage, customers are kept in a dict keyed by email plus a sorted email index '''
+
+    def __init__(self, rewards=None, customers=None):
+        ''' Reads may run on executor threads while writes happen on the IOLoop, so everything takes the lock '''
+        self._lock = threading.RLock()
+
+        self._rewards = sorted((dict(r) for r in rewards or DEFAULT_REWARDS), key=lambda r: r['points'])
+        self._customers = {}
+        self._emails = []
+
+        '''
+        Accrual buckets by email then bucket, plus a heap ordered by expiry so sweeps only see expired ones.
+
+        Every bucket gets a new entry number when it's created, heap entries left behind by a bucket that was deleted
+        and created again carry the old number and are skipped.
+        '''
+        self._accruals = {}
+        self._expiry_heap = []
+        self._entries = itertools.count()
+
+        for customer in customers or []:
+            self.save_customer(customer)
+
+    def get_customer(self, email, primary=False):
+        with self._lock:
+            customer = self._customers.get(email)
+
+        return dict(customer) if customer else None
+
+    def get_customers(self, emails, primary=False):
+        with self._lock:
+            return {e: dict(self._customers[e]) for e in emails if e in self._customers}
+
+    def save_customer(self, customer):
+        email = customer['email']
+
+        with self._lock:
+            if email not in self._customers:
+                bisect.insort(self._emails, email)
+
+            self._customers[email] = dict(customer)
+
+    def delete_customer(self, email):
+        with self._lock:
+            customer = self._customers.pop(email, None)
+
+            if customer:
+                del self._emails[bisect.bisect_left(self._emails, email)]
+
+        return customer
+
+    def search_customers(self, term, prefix=False):
+        with self._lock:
+            if not prefix:
+                return [dict(self._customers[e]) for e in self._emails if term in e]
+
+            ''' Emails starting with the prefix sort between the prefix and the prefix with its last char bumped '''
+            start = bisect.bisect_left(self._emails, term)
+            end = bisect.bisect_left(self._emails, term[:-1] + chr(ord(term[-1]) + 1)) if term else len(self._emails)
+
+            return [dict(self._customers[e]) for e in self._emails[start:end]]
+
+    def list_customers(self):
+        with self._lock:
+            return [dict(self._customers[e]) for e in self._emails]
+
+    def iter_emails(self):
+        with self._lock:
+            return list(self._emails)
+
+    def list_rewards(self):
+        return [dict(r) for r in self._rewards]
+
+    def add_accrual(self, email, bucket, points, expires_at):
+        with self._lock:
+            buckets = self._accruals.setdefault(email, {})
+            accrual = buckets.get(bucket)
+
+            if accrual is None:
+                entry = next(self._entries)
+                accrual = buckets[bucket] = {'points': 0, 'expiresAt': expires_at, 'entry': entry}
+                heapq.heappush(self._expiry_heap, (expires_at, entry, email, bucket))
+
+            accrual['points'] += points
+
+    def delete_accruals(self, email):
+        ''' Heap entries are left behind and skipped when they're popped '''
+        with self._lock:
+            self._accruals.pop(email, None)
+
+    def claim_expired_accruals(self, now, limit):
+        ''' Claimed buckets are off the heap but still stored, so releasing them only pushes them back on '''
+        claimed = []
+
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now and len(claimed) < limit:
+                expires_at, entry, email, bucket = heapq.heappop(self._expiry_heap)
+
+                if self._current(email, bucket, entry):
+                    claimed.append(dict(self._accruals[email][bucket], email=email, bucket=bucket))
+
+        return claimed
+
+    def delete_claimed_accruals(self, accruals):
+        ''' Buckets created again since they were claimed are left alone '''
+        with self._lock:
+            for accrual in accruals:
+                email, bucket = accrual['email'], accrual['bucket']
+
+                if self._current(email, bucket, accrual['entry']):
+                    del self._accruals[email][bucket]
+
+                    if not self._accruals[email]:
+                        del self._accruals[email]
+
+    def release_claimed_accruals(self, accruals):
+        with self._lock:
+            for accrual in accruals:
+                email, bucket, entry = accrual['email'], accrual['bucket'], accrual['entry']
+
+                if self._current(email, bucket, entry):
+                    heapq.heappush(self._expiry_heap, (accrual['expiresAt'], entry, email, bucket))
+
+    def _current(self, email, bucket, entry):
+        accrual = self._accruals.get(email, {}).get(bucket)
+
+        return accrual is not None and accrual['entry'] == entry
@@ -0,0 +1,223 @@
+import datetime
+import functools
+import re
+
+import pymongo
+
+from bson import ObjectId
+from pymongo import MongoClient, ASCENDING, ReplaceOne
+from pymongo.errors import PyMongoError, ServerSelectionTimeoutError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from rewardsservice.clients.storage_client import StorageClient
+from rewardsservice.deadline import DeadlineExceeded
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+
+# Claims older than this are assumed to belong to a sweep that died before deleting or releasing its buckets
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+
+# Mongo rejects a positive maxStalenessSeconds below 90, but only once it selects a server for a read
+MIN_MAX_STALENESS = 90
+
+
+def read_preference(mode, max_staleness=-1):
+    if mode not in READ_PREFERENCES:
+        raise ValueError('Unknown read preference %s' % mode)
+
+    ''' Staleness only applies to secondaries, the primary is never stale '''
+    if mode == 'primary':
+        return Primary()
+
+    return READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+def bounded(method, write=False):
+    '''
+    Fail before calling mongo once the deadline has passed, otherwise run the call with the remaining budget as its
+    pymongo timeout, which covers server selection, maxTimeMS and the socket for reads and writes alike.
+
+    Mongo timeouts are reported as an exceeded deadline, ambiguous for writes since they may have been applied anyway,
+    unless no server was selected and nothing was sent.
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        max_time_ms = self.max_time_ms()
+
+        try:
+            with pymongo.timeout(max_time_ms / 1000 if max_time_ms else None):
+                return method(self, *args, **kwargs)
+        except PyMongoError as e:
+            if not e.timeout:
+                raise
+
+            raise DeadlineExceeded(ambiguous=write and not isinstance(e, ServerSelectionTimeoutError))
+
+    return wrapper
+
+
+def bounded_write(method):
+    return bounded(method, write=True)
+
+
+class MongoStorageClient(StorageClient):
+    '''
+    Reads are split by endpoint so they can use different read preferences:
+        lookup: single and multi customer lookups
+        customers: customer listings and searches
+        rewards: the reward tiers
+
+    Reads whose result is written back, like incrementing points or expiring them, always go to the primary so a
+    lagging secondary can't make them overwrite newer points. Accrual buckets are only used for expiry, so every
+    accrual read is on the primary too.
+    '''
+
+    def __init__(self, uri='mongodb://mongodb:27017', lookup_read_preference='primary',
+                 customers_read_preference='primary', rewards_read_preference='primary', max_staleness=-1, **kwargs):
+        if max_staleness != -1 and max_staleness < MIN_MAX_STALENESS:
+            raise ValueError('max_staleness must be -1 or at least %d seconds' % MIN_MAX_STALENESS)
+
+        ''' MongoClient keeps its own connection pool, so one instance is shared by every request '''
+        self.client = MongoClient(uri, **kwargs)
+
+        self.read_preferences = {
+            'primary': Primary(),
+            'lookup': read_preference(lookup_read_preference, max_staleness),
+            'customers': read_preference(customers_read_preference, max_staleness),
+            'rewards': read_preference(rewards_read_preference, max_staleness),
+        }
+
+    @classmethod
+    def from_options(cls, options):
+        ''' Calls bound to a request get its remaining budget, the socket timeout only bounds the unbound ones '''
+        return cls(options.mongo_uri, options.lookup_read_preference, options.customers_read_preference,
+                   options.rewards_read_preference, options.max_staleness,
+                   socketTimeoutMS=int(options.request_timeout * 1000))
+
+    def get_collection(self, name, endpoint='lookup'):
+        name = name.lower()
+        db = self.client.get_database(name.capitalize())
+
+        return db.get_collection(name, read_preference=self.read_preferences[endpoint])
+
+    @bounded
+    def get_customer(self, email, primary=False):
+        collection = self.get_collection('customers', 'primary' if primary else 'lookup')
+
+        return collection.find_one({'email': email}, {'_id': 0})
+
+    @bounded
+    def get_customers(self, emails, primary=False):
+        query = {'email': {'$in': list(emails)}}
+        collection = self.get_collection('customers', 'primary' if primary else 'lookup')
+        customers = collection.find(query, {'_id': 0})
+
+        return {c['email']: c for c in customers}
+
+    @bounded_write
+    def save_customer(self, customer):
+        ''' Pass a copy, pymongo would otherwise add the ObjectId to the returned customer '''
+        self.get_collection('customers').replace_one({'email': customer['email']}, dict(customer), True)
+
+    @bounded_write
+    def save_customers(self, customers):
+        requests = [ReplaceOne({'email': c['email']}, dict(c), True) for c in customers]
+
+        if requests:
+            self.get_collection('customers').bulk_write(requests, ordered=False)
+
+    @bounded_write
+    def delete_customer(self, email):
+        return self.get_collection('customers').find_one_and_delete({'email': email}, {'_id': 0})
+
+    @bounded
+    def search_customers(self, term, prefix=False):
+        ''' Anchored regexes can use the email index, unanchored ones scan the collection '''
+        pattern = ('^%s' if prefix else '.*%s.*') % re.escape(term)
+        collection = self.get_collection('customers', 'customers')
+
+        return list(collection.find({'email': {'$regex': pattern}}, {'_id': 0}))
+
+    @bounded
+    def list_customers(self):
+        collection = self.get_collection('customers', 'customers')
+
+        return list(collection.find({}, {'_id': 0}))
+
+    def iter_emails(self):
+        ''' Only the email field comes over the wire, in large batches '''
+        cursor = self.get_collection('customers', 'customers').find({}, {'email': 1, '_id': 0}, batch_size=10000)
+
+        return (c['email'] for c in cursor)
+
+    @bounded
+    def list_rewards(self):
+        collection = self.get_collection('rewards', 'rewards')
+
+        return list(collection.find({}, {'_id': 0}, sort=[('points', ASCENDING)]))
+
+    @bounded_write
+    def add_accrual(self, email, bucket, points, expires_at):
+        self.get_collection('accruals', 'primary').update_one(
+            {'email': email, 'bucket': bucket},
+            {'$inc': {'points': points}, '$setOnInsert': {'expiresAt': expires_at}},
+            True
+        )
+
+    @bounded_write
+    def delete_accruals(self, email):
+        self.get_collection('accruals', 'primary').delete_many({'email': email})
+
+    @bounded_write
+    def claim_expired_accruals(self, now, limit):
+        '''
+        The expiresAt index means this only ever reads buckets that have expired. They're claimed with a token so
+        concurrent sweeps skip them, and a claim left behind by a sweep that died is taken over after CLAIM_TIMEOUT.
+        '''
+        collection = self.get_collection('accruals', 'primary')
+        claimed_at = datetime.datetime.utcnow()
+
+        unclaimed = {
+            'expiresAt': {'$lte': now},
+            '$or': [{'claimedAt': None}, {'claimedAt': {'$lte': claimed_at - CLAIM_TIMEOUT}}],
+        }
+        ids = [a['_id'] for a in collection.find(unclaimed, {'_id': 1}, sort=[('expiresAt', ASCENDING)], limit=limit)]
+
+        if not ids:
+            return []
+
+        claim = ObjectId()
+        collection.update_many(dict(unclaimed, _id={'$in': ids}), {'$set': {'claim': claim, 'claimedAt': claimed_at}})
+
+        return list(collection.find({'_id': {'$in': ids}, 'claim': claim}, sort=[('expiresAt', ASCENDING)]))
+
+    @bounded_write
+    def delete_claimed_accruals(self, accruals):
+        ''' Matching the claim too leaves buckets alone that another sweep took over after this one timed out '''
+        for claim, ids in self._claimed_ids(accruals).items():
+            self.get_collection('accruals', 'primary').delete_many({'_id': {'$in': ids}, 'claim': claim})
+
+    @bounded_write
+    def release_claimed_accruals(self, accruals):
+        for claim, ids in self._claimed_ids(accruals).items():
+            self.get_collection('accruals', 'primary').update_many({'_id': {'$in': ids}, 'claim': claim},
+                                                                   {'$unset': {'claim': '', 'claimedAt': ''}})
+
+    @staticmethod
+    def _claimed_ids(accruals):
+        claimed = {}
+
+        for accrual in accruals:
+            claimed.setdefault(accrual['claim'], []).append(accrual['_id'])
+
+        return claimed
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,94 @@
+import copy
+
+from rewardsservice.rewards import customer_rewards
+
+
+class StorageClient(object):
+    ''' Storage interface the handlers depend on, backends only implement the primitive reads and writes '''
+
+    deadline = None
+
+    @classmethod
+    def from_options(cls, options):
+        return cls()
+
+    def bind(self, deadline):
+        ''' Shallow copy sharing the backend connection, whose calls are bounded by the request's deadline '''
+        bound = copy.copy(self)
+        bound.deadline = deadline
+
+        return bound
+
+    def max_time_ms(self):
+        return self.deadline.max_time_ms() if self.deadline else None
+
+    def get_customer(self, email, primary=False):
+        ''' Pass primary when the customer is read to be written back, backends with replicas must not read stale '''
+        raise NotImplementedError()
+
+    def get_customers(self, emails, primary=False):
+        ''' Customers keyed by email, emails without a customer are left out '''
+        customers = (self.get_customer(email, primary) for email in emails)
+
+        return {c['email']: c for c in customers if c}
+
+    def save_customer(self, customer):
+        raise NotImplementedError()
+
+    def save_customers(self, customers):
+        for customer in customers:
+            self.save_customer(customer)
+
+    def delete_customer(self, email):
+        raise NotImplementedError()
+
+    def search_customers(self, term, prefix=False):
+        raise NotImplementedError()
+
+    def list_customers(self):
+        raise NotImplementedError()
+
+    def iter_emails(self):
+        ''' Every customer email, without loading the rest of the customers '''
+        raise NotImplementedError()
+
+    def list_rewards(self):
+        ''' Reward tiers sorted by ascending points '''
+        raise NotImplementedError()
+
+    def add_accrual(self, email, bucket, points, expires_at):
+        ''' Add points to the customer's accrual bucket, creating it with the given expiry if needed '''
+        raise NotImplementedError()
+
+    def delete_accruals(self, email):
+        raise NotImplementedError()
+
+    def claim_expired_accruals(self, now, limit):
+        '''
+        Claim and return up to limit buckets that expired at or before now, oldest first.
+
+        Claimed buckets aren't returned by other claims, they stay until they're deleted once the balances they expire
+        are saved, or released when that fails.
+        '''
+        raise NotImplementedError()
+
+    def delete_claimed_accruals(self, accruals):
+        raise NotImplementedError()
+
+    def release_claimed_accruals(self, accruals):
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def upsert_customer(self, email, points):
+        customer = customer_rewards(email, points, self.list_rewards())
+        self.save_customer(customer)
+
+        return customer
+
+    def increment_customer(self, email, points):
+        ''' Sum existing points with the new ones if the customer exists '''
+        customer = self.get_customer(email, primary=True) or {}
+
+        return self.upsert_customer(email, customer.get('points', 0) + points)
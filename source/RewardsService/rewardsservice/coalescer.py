@@ -0,0 +1,101 @@
+import json
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from tornado.ioloop import IOLoop
+
+
+def dumps(fn, *args):
+    ''' Run a storage read and encode it, so coalesced requests share the encoded response as well '''
+    return json.dumps(fn(*args))
+
+
+class Coalescer(object):
+    '''
+    Single-flight reads: concurrent calls with the same key share one backend call running on the executor,
+    and with a ttl the result is kept around for calls arriving shortly after.
+
+    Keys are tuples starting with a namespace, so writes can drop everything they may have made stale.
+    Kept results are bounded by max_results, the oldest ones go first.
+    '''
+
+    def __init__(self, ttl=0, max_workers=8, max_results=1000):
+        self.ttl = ttl
+        self.max_results = max_results
+        self.executor = ThreadPoolExecutor(max_workers)
+
+        self._in_flight = {}
+        self._results = OrderedDict()
+
+        self.requests = 0
+        self.queries = 0
+        self.cache_hits = 0
+
+    def run(self, key, fn, *args):
+        self.requests += 1
+        self._evict(time.time())
+
+        cached = self._results.get(key)
+
+        if cached and cached[0] > time.time():
+            self.cache_hits += 1
+            return cached[1]
+
+        future = self._in_flight.get(key)
+
+        if future is None:
+            self.queries += 1
+
+            future = IOLoop.current().run_in_executor(self.executor, fn, *args)
+            self._in_flight[key] = future
+
+            IOLoop.current().add_future(future, lambda f: self._done(key, f))
+
+        return future
+
+    def forget(self, namespace):
+        ''' Later calls in the namespace start a new query, callers already waiting still get the old result '''
+        for cache in (self._in_flight, self._results):
+            for key in [k for k in cache if k[0] == namespace]:
+                del cache[key]
+
+    def metrics(self):
+        coalesced = self.requests - self.queries
+
+        return {
+            'requests': self.requests,
+            'queries': self.queries,
+            'coalesced': coalesced,
+            'cacheHits': self.cache_hits,
+            'ratio': coalesced / self.requests if self.requests else 0.0
+        }
+
+    def _done(self, key, future):
+        ''' Only clean up if a write hasn't replaced this query in the meantime '''
+        if self._in_flight.get(key) is not future:
+            return
+
+        del self._in_flight[key]
+
+        if self.ttl and not future.exception():
+            self._results.pop(key, None)
+            self._results[key] = (time.time() + self.ttl, future)
+
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _evict(self, now):
+        ''' Every result is kept for the same ttl, so the expired ones are always at the front '''
+        while self._results:
+            key, (expires, _) = next(iter(self._results.items()))
+
+            if expires > now:
+                break
+
+            del self._results[key]
+
+    @property
+    def size(self):
+        return len(self._results)
@@ -0,0 +1,68 @@
+import datetime
+import time
+
+from tornado import gen
+from tornado.gen import coroutine
+from tornado.options import options
+from tornado.web import HTTPError
+
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+
+
+class Deadline(object):
+    ''' Point in time a request has to be answered by, backed by the monotonic clock '''
+
+    def __init__(self, timeout):
+        self.expires = time.monotonic() + timeout
+
+    @classmethod
+    def default(cls):
+        return cls(options.request_timeout)
+
+    @classmethod
+    def from_request(cls, request):
+        ''' Callers can only shorten the configured timeout with the header, never extend it '''
+        timeout = options.request_timeout
+
+        try:
+            header = int(request.headers[DEADLINE_HEADER])
+        except (KeyError, ValueError):
+            header = 0
+
+        ''' Zero or negative budgets are ignored rather than failing every request sent with them '''
+        if header > 0:
+            timeout = min(timeout, header / 1000)
+
+        return cls(timeout)
+
+    def remaining(self):
+        return max(0, self.expires - time.monotonic())
+
+    def max_time_ms(self):
+        ''' Remaining budget for a backend call, raises once there's nothing left to spend '''
+        remaining = int(self.remaining() * 1000)
+
+        if remaining <= 0:
+            raise DeadlineExceeded()
+
+        return remaining
+
+
+@coroutine
+def within(deadline, future):
+    ''' Wait for the future only as long as the deadline allows, it keeps running if the deadline passes '''
+    try:
+        result = yield gen.with_timeout(datetime.timedelta(seconds=deadline.remaining()), future,
+                                        quiet_exceptions=(DeadlineExceeded,))
+    except gen.TimeoutError:
+        raise DeadlineExceeded()
+
+    return result
+
+
+class DeadlineExceeded(HTTPError):
+    ''' Ambiguous when a write timed out after it was sent, it may or may not have been applied '''
+
+    def __init__(self, ambiguous=False):
+        super(DeadlineExceeded, self).__init__(504, 'Request deadline exceeded')
+        self.ambiguous = ambiguous
@@ -0,0 +1,47 @@
+import bisect
+import threading
+
+
+class EmailIndex(object):
+    '''
+    Sorted in-process array of customer emails for autocomplete, prefix lookups are two bisects and a slice.
+
+    It's built once from storage and then kept current by this process's own writes, so writes made by other
+    service processes only show up after a restart.
+    '''
+
+    def __init__(self, emails=()):
+        self._lock = threading.Lock()
+        self._emails = sorted(set(emails))
+
+    @classmethod
+    def from_storage(cls, storage):
+        return cls(storage.iter_emails())
+
+    @property
+    def size(self):
+        return len(self._emails)
+
+    def add(self, email):
+        with self._lock:
+            i = bisect.bisect_left(self._emails, email)
+
+            if i == len(self._emails) or self._emails[i] != email:
+                self._emails.insert(i, email)
+
+    def remove(self, email):
+        with self._lock:
+            i = bisect.bisect_left(self._emails, email)
+
+            if i < len(self._emails) and self._emails[i] == email:
+                del self._emails[i]
+
+    def suggest(self, prefix, limit=10):
+        if not prefix:
+            return []
+
+        ''' Limits are small, so slice from the first match rather than bisecting for the end of the range '''
+        start = bisect.bisect_left(self._emails, prefix)
+        matches = self._emails[start:start + limit]
+
+        return [e for e in matches if e.startswith(prefix)]
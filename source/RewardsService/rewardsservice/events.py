@@ -0,0 +1,23 @@
+class CustomerEvents(object):
+    '''
+    In-process publisher for customer changes, subscribers are called with the event name and the customer.
+
+    Only writes handled by this process are published, running several service processes needs a shared broker.
+    '''
+
+    def __init__(self):
+        self._subscribers = set()
+
+    def subscribe(self, callback):
+        self._subscribers.add(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.discard(callback)
+
+    def publish(self, event, customer):
+        for callback in list(self._subscribers):
+            callback(event, customer)
+
+    @property
+    def subscribers(self):
+        return len(self._subscribers)
@@ -0,0 +1,90 @@
+import datetime
+
+from collections import Counter
+
+from tornado import gen
+from tornado.gen import coroutine
+
+from rewardsservice.rewards import customer_rewards
+
+
+class PointsExpiry(object):
+    '''
+    Points are accrued into monthly buckets per customer, and a bucket expires a number of days after its month ends.
+
+    Sweeps claim only the buckets that expired since the last sweep and take their points off those customers' balances,
+    so the cost follows the number of expired buckets rather than the number of customers. Buckets are deleted only
+    after the balances are saved, a sweep that fails before that releases them for the next one.
+    '''
+
+    def __init__(self, storage, days, batch_size=1000):
+        self.storage = storage
+        self.days = days
+        self.batch_size = batch_size
+
+        self._sweeping = False
+
+    def bucket(self, now=None):
+        now = now or datetime.datetime.utcnow()
+        month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+
+        return month.strftime('%Y-%m'), next_month + datetime.timedelta(days=self.days)
+
+    def accrue(self, email, points, replace=False, now=None):
+        ''' Record points earned now, replace drops the older buckets when the balance itself was overwritten '''
+        if replace:
+            self.storage.delete_accruals(email)
+
+        if points:
+            bucket, expires_at = self.bucket(now)
+            self.storage.add_accrual(email, bucket, points, expires_at)
+
+    def forget(self, email):
+        self.storage.delete_accruals(email)
+
+    def sweep(self, now=None):
+        ''' Expire one batch of buckets, returns how many expired and the customers whose balance changed '''
+        accruals = self.storage.claim_expired_accruals(now or datetime.datetime.utcnow(), self.batch_size)
+
+        expired = Counter()
+        for accrual in accruals:
+            expired[accrual['email']] += accrual['points']
+
+        try:
+            rewards = self.storage.list_rewards()
+            customers = [
+                customer_rewards(email, max(0, customer['points'] - expired[email]), rewards)
+                for email, customer in self.storage.get_customers(list(expired), primary=True).items()
+            ]
+
+            self.storage.save_customers(customers)
+        except Exception:
+            self.storage.release_claimed_accruals(accruals)
+            raise
+
+        self.storage.delete_claimed_accruals(accruals)
+
+        return len(accruals), customers
+
+    @coroutine
+    def sweep_all(self, on_update=None, now=None):
+        ''' Sweep batches until nothing is left to expire, yielding to the IOLoop between batches '''
+        if self._sweeping:
+            return
+
+        self._sweeping = True
+
+        try:
+            while True:
+                count, customers = self.sweep(now)
+
+                if customers and on_update:
+                    on_update(customers)
+
+                if count < self.batch_size:
+                    break
+
+                yield gen.moment
+        finally:
+            self._sweeping = False
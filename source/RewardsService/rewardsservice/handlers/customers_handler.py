@@ -1,67 +1,95 @@
+import collections
 import json
 import math
 import re
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
 from tornado.gen import coroutine
+from tornado.options import options
 from tornado.web import RequestHandler, HTTPError
 
+from rewardsservice.coalescer import dumps
+from rewardsservice.deadline import Deadline, DeadlineExceeded, within
+
+EMAIL_PATTERN = re.compile('^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+
 
 class CustomersHandler(RequestHandler):
     def initialize(self):
-        self.client = MongoClient("mongodb", 27017)
-
-    def on_finish(self):
-        self.client.close()
+        self.storage = self.settings['storage']
+        self.coalescer = self.settings['coalescer']
+        self.events = self.settings['events']
+        self.expiry = self.settings['expiry']
+        self.email_index = self.settings['email_index']
 
-    def get_collection(self, name):
-        name = name.lower()
-        db = self.client.get_database(name.capitalize())
+    def prepare(self):
+        self.deadline = Deadline.from_request(self.request)
 
-        return db.get_collection(name)
+        # Coalesced reads are shared between requests, so they get the full timeout and each request waits on its own
+        self.shared_storage = self.storage.bind(Deadline.default())
+        self.storage = self.storage.bind(self.deadline)
 
     def set_default_headers(self):
         self.set_header("Access-Control-Allow-Origin", "*")
-        self.set_header("Access-Control-Allow-Headers", "x-requested-with")
+        self.set_header("Access-Control-Allow-Headers", "x-requested-with, x-request-timeout-ms")
         self.set_header('Access-Control-Allow-Methods', 'POST, GET, PUT, OPTIONS')
 
     @coroutine
     def get(self):
-        collection = self.get_collection('customers')
-
         email = self.get_email(False)
         search = self.get_argument('s', None)
 
         if email:
-            customers = collection.find_one({'email': email}, {'_id': 0})
+            customers = self.storage.get_customer(email)
 
             if not customers:
                 raise HTTPError(404, 'No customer found with the email %s' % email)
+
+            body = json.dumps(customers)
+
+        # Identical listings and searches running at the same time share one query, get_argument strips the term so
+        # searches differing only by surrounding whitespace share a key and a blank one is the listing
         elif search:
-            customers = list(collection.find({'email': {'$regex': '.*%s.*' % re.escape(search)}}, {'_id': 0}))
+            future = self.coalescer.run(('customers', search), dumps, self.shared_storage.search_customers, search)
+            body = yield within(self.deadline, future)
 
         else:
-            customers = list(collection.find({}, {'_id': 0}))
+            future = self.coalescer.run(('customers', None), dumps, self.shared_storage.list_customers)
+            body = yield within(self.deadline, future)
 
         # Force response as json
         self.set_header('Content-Type', 'application/json')
-        self.write(json.dumps(customers))
+        self.write(body)
 
     @coroutine
     def delete(self):
         email = self.get_email()
-        collection = self.get_collection('customers')
 
-        customer = collection.find_one_and_delete({'email': email}, {'_id': 0})
+        try:
+            customer = self.storage.delete_customer(email)
+        except DeadlineExceeded as e:
+            if e.ambiguous:
+                self.deleted(email)
+            raise
 
         if not customer:
             raise HTTPError(400, 'No customer found with the email %s' % email)
 
+        self.deleted(email, customer)
+
         self.write(customer)
 
     @coroutine
     def post(self):
-        customer = self._insert_or_replace(self.get_email(), self.get_points())
+        email, points = self.get_email(), self.get_points()
+
+        try:
+            customer = self.storage.upsert_customer(email, points)
+        except DeadlineExceeded as e:
+            if e.ambiguous:
+                self.updated(email, points, replace=True)
+            raise
+
+        self.updated(email, points, customer, replace=True)
 
         self.write(customer)
 
@@ -72,24 +100,53 @@ class CustomersHandler(RequestHandler):
 
     @coroutine
     def put(self):
-        email = self.get_email()
-        collection = self.get_collection('customers')
+        email, points = self.get_email(), self.get_points()
 
-        ''' Sum existing points with ones from query args if user exists '''
-        customer = collection.find_one({'email': email}, ['points']) or {}
-        points = customer.get('points', 0) + self.get_points()
+        try:
+            customer = self.storage.increment_customer(email, points)
+        except DeadlineExceeded as e:
+            if e.ambiguous:
+                self.updated(email, points)
+            raise
 
-        customer = self._insert_or_replace(email, points)
+        self.updated(email, points, customer)
 
         self.write(customer)
 
-    def get_email(self, required=True):
-        default = self._ARG_DEFAULT if required else ''
+    def updated(self, email, points, customer=None, replace=False):
+        '''
+        Keep caches, the email index, expiry and dashboards in line with a write. A write that timed out comes without
+        the customer and may or may not have been applied, caches and the index take it as applied and dashboards are
+        told to fetch the customer again, but expiry is left alone so it never takes points the customer didn't get.
+        '''
+        self.coalescer.forget('customers')
+        self.email_index.add(email)
+
+        if self.expiry and customer:
+            self.expiry.accrue(email, points, replace=replace)
+
+        self.publish('update', email, customer)
+
+    def deleted(self, email, customer=None):
+        self.coalescer.forget('customers')
+        self.email_index.remove(email)
 
-        email = self.get_argument('email', default)
+        if self.expiry and customer:
+            self.expiry.forget(email)
+
+        self.publish('delete', email, customer)
+
+    def publish(self, event, email, customer):
+        if customer is None:
+            self.events.publish('refresh', {'email': email})
+        else:
+            self.events.publish(event, customer)
+
+    def get_email(self, required=True):
+        email = self.get_argument('email') if required else self.get_argument('email', '')
 
         # Check if this is a valid email address format
-        matches = re.match('^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$', email)
+        matches = EMAIL_PATTERN.match(email)
 
         if (required or email) and not matches:
             raise InvalidValueError('email')
@@ -115,49 +172,66 @@ class CustomersHandler(RequestHandler):
 
         self.finish({'error': {'code': status_code, 'message': message}})
 
-    def _insert_or_replace(self, email, points):
-        reward_collection = self.get_collection('rewards')
-        rewards = reward_collection.find({}, sort=[('points', ASCENDING)])
 
-        """
-        This could just as well be accomplished with database queries (but I don't think that's what you're looking for)
+class CustomersLookupHandler(CustomersHandler):
+    SUPPORTED_METHODS = ('POST', 'OPTIONS')
 
-        current_reward = reward_collection.find_one({'points': {'$lte': points}}, sort=[('points', DESCENDING)])
-        next_reward = reward_collection.find_one({'points': {'$gt': points}}, sort=[('points', ASCENDING)])
-        """
+    def set_default_headers(self):
+        super(CustomersLookupHandler, self).set_default_headers()
+        self.set_header("Access-Control-Allow-Headers", "x-requested-with, x-request-timeout-ms, content-type")
+
+    @coroutine
+    def post(self):
+        emails = self.get_emails()
+
+        ''' One query for the whole batch, customers that don't exist are returned as null '''
+        customers = self.storage.get_customers(emails)
 
-        current_reward = {}
-        next_reward = rewards.next()
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps({email: customers.get(email) for email in emails}))
 
-        while points >= next_reward.get('points', 0):
+    def get_emails(self):
+        if self.request.headers.get('Content-Type', '').startswith('application/json'):
             try:
-                current_reward = next_reward
-                next_reward = rewards.next()
-
-            except StopIteration:
-                """ 
-                Break the loop if we get to the end of the reward tiers
-
-                This lets the api show the highest tier as the next rewards tier for customers in the highest tier,
-                the whole idea being that because there's no higher level, progress will be greater than 1.0 or 100%
-                """
-                break
-
-        ''' Prepare customer object for insertion/update into the db '''
-        customer = {
-            'email': email,
-            'points': points,
-            'tier': current_reward.get('tier'),
-            'rewardName': current_reward.get('rewardName'),
-            'nextTier': next_reward.get('tier'),
-            'nextRewardName': next_reward.get('rewardName'),
-            'nextTierProgress': points / next_reward.get('points')
-        }
-
-        customer_collection = self.get_collection('customers')
-        customer_collection.replace_one({'email': email}, customer, True)
-
-        return customer
+                emails = json.loads(self.request.body.decode('utf-8')).get('emails')
+            except (ValueError, AttributeError):
+                raise InvalidValueError('emails')
+        else:
+            emails = self.get_arguments('email')
+
+        if not isinstance(emails, list) or not emails:
+            raise InvalidValueError('emails')
+
+        ''' Duplicates count towards the cap, so oversized requests are turned down before any email is looked at '''
+        if len(emails) > options.lookup_max_emails:
+            raise HTTPError(400, 'Too many emails, at most %d per lookup' % options.lookup_max_emails)
+
+        ''' Json bodies can hold anything, check every item before hashing them to drop duplicates '''
+        for email in emails:
+            if not isinstance(email, str) or not EMAIL_PATTERN.match(email):
+                raise InvalidValueError('email')
+
+        ''' Drop duplicates but keep the order they were asked for in '''
+        return list(collections.OrderedDict.fromkeys(emails))
+
+
+class CustomersSuggestHandler(CustomersHandler):
+    SUPPORTED_METHODS = ('GET', 'OPTIONS')
+
+    @coroutine
+    def get(self):
+        prefix = self.get_argument('prefix', '')
+
+        try:
+            limit = int(self.get_argument('limit', 10))
+        except ValueError:
+            raise InvalidValueError('limit')
+
+        if not 0 < limit <= options.suggest_max_limit:
+            raise InvalidValueError('limit')
+
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps(self.email_index.suggest(prefix, limit)))
 
 
 class InvalidValueError(HTTPError):
@@ -0,0 +1,67 @@
+import datetime
+import json
+
+from tornado import gen
+from tornado.gen import coroutine
+from tornado.iostream import StreamClosedError
+from tornado.queues import Queue, QueueFull
+from tornado.web import RequestHandler
+
+
+class CustomerEventsHandler(RequestHandler):
+    ''' Server-sent events stream of customer updates and deletes, so dashboards can patch single rows '''
+
+    KEEPALIVE = datetime.timedelta(seconds=15)
+    MAX_PENDING = 1000
+
+    def initialize(self):
+        self.events = self.settings['events']
+        self.queue = Queue(self.MAX_PENDING)
+        self.dropped = False
+
+    def set_default_headers(self):
+        self.set_header("Access-Control-Allow-Origin", "*")
+        self.set_header('Content-Type', 'text/event-stream')
+        self.set_header('Cache-Control', 'no-cache')
+
+    @coroutine
+    def get(self):
+        self.events.subscribe(self.on_event)
+
+        try:
+            ''' Tell EventSource how long to wait before reconnecting, and get the headers out right away '''
+            self.write('retry: 3000\n\n')
+            yield self.flush()
+
+            while not (self.dropped and self.queue.empty()):
+                try:
+                    event = yield self.queue.get(timeout=self.KEEPALIVE)
+                except gen.TimeoutError:
+                    self.write(': keepalive\n\n')
+                else:
+                    if event is None:
+                        break
+
+                    self.write('event: %s\ndata: %s\n\n' % (event[0], json.dumps(event[1])))
+
+                yield self.flush()
+        except StreamClosedError:
+            pass
+        finally:
+            self.events.unsubscribe(self.on_event)
+
+    def on_event(self, event, customer):
+        try:
+            self.queue.put_nowait((event, customer))
+        except QueueFull:
+            ''' Stop streaming to clients that can't keep up instead of buffering for them, EventSource reconnects '''
+            self.events.unsubscribe(self.on_event)
+            self.dropped = True
+
+    def on_connection_close(self):
+        self.events.unsubscribe(self.on_event)
+
+        try:
+            self.queue.put_nowait(None)
+        except QueueFull:
+            pass
@@ -0,0 +1,12 @@
+import json
+import tornado.web
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        metrics = {
+            'coalescing': self.settings['coalescer'].metrics()
+        }
+
+        self.set_header('Content-Type', 'application/json')
+        self.write(json.dumps(metrics))
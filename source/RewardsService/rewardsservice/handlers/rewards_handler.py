@@ -1,17 +1,25 @@
-import json
 import tornado.web
 
-from pymongo import MongoClient
 from tornado.gen import coroutine
 
+from rewardsservice.coalescer import dumps
+from rewardsservice.deadline import Deadline, within
+
 
 class RewardsHandler(tornado.web.RequestHandler):
+    def initialize(self):
+        self.storage = self.settings['storage']
+        self.coalescer = self.settings['coalescer']
+
+    def prepare(self):
+        self.deadline = Deadline.from_request(self.request)
+
+        # The read is shared with other requests, so it gets the full timeout and this request waits on its own
+        self.storage = self.storage.bind(Deadline.default())
 
     @coroutine
     def get(self):
-        client = MongoClient("mongodb", 27017)
-        db = client["Rewards"]
-        rewards = list(db.rewards.find({}, {"_id": 0}))
+        rewards = yield within(self.deadline, self.coalescer.run(('rewards',), dumps, self.storage.list_rewards))
 
         self.set_header('Content-Type', 'application/json')
-        self.write(json.dumps(rewards))
+        self.write(rewards)
@@ -0,0 +1,44 @@
+DEFAULT_REWARDS = [
+    {"points": 100, "rewardName": "5% off purchase", "tier": "A"},
+    {"points": 200, "rewardName": "10% off purchase", "tier": "B"},
+    {"points": 300, "rewardName": "15% off purchase", "tier": "C"},
+    {"points": 400, "rewardName": "20% off purchase", "tier": "D"},
+    {"points": 500, "rewardName": "25% off purchase", "tier": "E"},
+    {"points": 600, "rewardName": "30% off purchase", "tier": "F"},
+    {"points": 700, "rewardName": "35% off purchase", "tier": "G"},
+    {"points": 800, "rewardName": "40% off purchase", "tier": "H"},
+    {"points": 900, "rewardName": "45% off purchase", "tier": "I"},
+    {"points": 1000, "rewardName": "50% off purchase", "tier": "J"},
+]
+
+
+def customer_rewards(email, points, rewards):
+    ''' Build the customer rewards document for the given points, rewards must be sorted by ascending points '''
+    rewards = iter(rewards)
+
+    current_reward = {}
+    next_reward = next(rewards)
+
+    while points >= next_reward.get('points', 0):
+        try:
+            current_reward = next_reward
+            next_reward = next(rewards)
+
+        except StopIteration:
+            """
+            Break the loop if we get to the end of the reward tiers
+
+            This lets the api show the highest tier as the next rewards tier for customers in the highest tier,
+            the whole idea being that because there's no higher level, progress will be greater than 1.0 or 100%
+            """
+            break
+
+    return {
+        'email': email,
+        'points': points,
+        'tier': current_reward.get('tier'),
+        'rewardName': current_reward.get('rewardName'),
+        'nextTier': next_reward.get('tier'),
+        'nextRewardName': next_reward.get('rewardName'),
+        'nextTierProgress': points / next_reward.get('points')
+    }
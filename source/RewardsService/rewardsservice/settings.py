@@ -10,6 +10,24 @@ STATIC_ROOT = path(ROOT, 'static')
 TEMPLATE_ROOT = path(ROOT, 'templates')
 
 define("port", default=7050, help="run on the given port", type=int)
+define("storage", default="mongo", help="storage backend, mongo or memory", type=str)
+define("request_timeout", default=10.0, help="seconds a request may take, callers can shorten it with the "
+       "X-Request-Timeout-Ms header", type=float)
+define("mongo_uri", default="mongodb://mongodb:27017", help="mongo connection string", type=str)
+define("lookup_read_preference", default="primary", help="read preference for customer lookups", type=str)
+define("customers_read_preference", default="primary", help="read preference for customer listings and searches",
+       type=str)
+define("rewards_read_preference", default="primary", help="read preference for the reward tiers", type=str)
+define("max_staleness", default=-1, help="max staleness in seconds for secondary reads, -1 for no limit", type=int)
+define("coalesce_ttl", default=0.0, help="seconds to keep coalesced read results, 0 only shares in-flight reads",
+       type=float)
+define("coalesce_max_results", default=1000, help="most coalesced read results kept at once", type=int)
+define("points_expiry_days", default=0, help="days after the end of the month points were earned in that they expire, "
+       "0 to never expire points", type=int)
+define("expiry_sweep_interval", default=60, help="seconds between sweeps for expired points", type=int)
+define("expiry_sweep_batch", default=1000, help="expired accrual buckets processed per sweep batch", type=int)
+define("lookup_max_emails", default=1000, help="most emails accepted by a single customers lookup", type=int)
+define("suggest_max_limit", default=50, help="most emails returned by a single email suggestion", type=int)
 
 settings = {
     'debug': True,
@@ -0,0 +1,138 @@
+import json
+import time
+
+from collections import Counter
+from unittest import mock
+
+from tornado.testing import gen_test
+
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.coalescer import Coalescer
+from rewardsservice.test.runtests import BaseTestCases
+
+
+class SlowStorageClient(MemoryStorageClient):
+    ''' Counts backend reads and holds them long enough for concurrent requests to pile up '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queries = Counter()
+
+    def search_customers(self, term, prefix=False):
+        self.queries['search'] += 1
+        time.sleep(0.1)
+
+        return super().search_customers(term, prefix)
+
+    def list_rewards(self):
+        self.queries['rewards'] += 1
+        time.sleep(0.1)
+
+        return super().list_rewards()
+
+
+class CoalescingTestCase(BaseTestCases.APITestCase):
+    _concurrency = 10
+
+    def get_storage(self):
+        return SlowStorageClient(customers=[{'email': 'customer%d@test.dev' % i, 'points': i} for i in range(5)])
+
+    def fetch_all(self, path):
+        return [self.http_client.fetch(self.get_url(path)) for _ in range(self._concurrency)]
+
+    @gen_test
+    def test_search_coalesced(self):
+        responses = yield self.fetch_all('/customers?s=customer')
+
+        self.assertEqual(1, self.storage.queries['search'])
+        self.assertEqual(1, len({r.body for r in responses}))
+        self.assertEqual(5, len(self.fetch_body(responses[0])))
+
+    @gen_test
+    def test_rewards_coalesced(self):
+        responses = yield self.fetch_all('/rewards')
+
+        self.assertEqual(1, self.storage.queries['rewards'])
+        self.assertTrue(all(r.code == 200 for r in responses))
+
+    @gen_test
+    def test_different_searches_not_coalesced(self):
+        yield [self.http_client.fetch(self.get_url('/customers?s=customer%d' % i)) for i in range(3)]
+
+        self.assertEqual(3, self.storage.queries['search'])
+
+    @gen_test
+    def test_metrics(self):
+        yield self.fetch_all('/customers?s=customer')
+
+        response = yield self.http_client.fetch(self.get_url('/metrics'))
+        metrics = self.fetch_body(response, 'coalescing')
+
+        self.assertEqual(self._concurrency, metrics['requests'])
+        self.assertEqual(1, metrics['queries'])
+        self.assertEqual(0.9, metrics['ratio'])
+
+    @gen_test
+    def test_sequential_not_cached_without_ttl(self):
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+
+        self.assertEqual(2, self.storage.queries['search'])
+
+
+class CoalescingTTLTestCase(BaseTestCases.APITestCase):
+    get_storage = CoalescingTestCase.get_storage
+
+    def get_coalescer(self):
+        return Coalescer(ttl=60)
+
+    @gen_test
+    def test_sequential_cached_with_ttl(self):
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+
+        self.assertEqual(1, self.storage.queries['search'])
+        self.assertEqual(1, self.coalescer.cache_hits)
+
+    @gen_test
+    def test_search_key_normalized(self):
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+        yield self.http_client.fetch(self.get_url('/customers?s=%20customer%20'))
+
+        self.assertEqual(1, self.storage.queries['search'])
+        self.assertEqual(1, self.coalescer.cache_hits)
+
+    @gen_test
+    def test_expired_results_evicted(self):
+        for i in range(3):
+            yield self.http_client.fetch(self.get_url('/customers?s=customer%d' % i))
+
+        self.assertEqual(3, self.coalescer.size)
+
+        with mock.patch('rewardsservice.coalescer.time') as clock:
+            clock.time.return_value = time.time() + 61
+            yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+
+        self.assertEqual(1, self.coalescer.size)
+
+    @gen_test
+    def test_results_bounded(self):
+        self.coalescer.max_results = 2
+
+        for i in range(5):
+            yield self.http_client.fetch(self.get_url('/customers?s=customer%d' % i))
+
+        self.assertEqual(2, self.coalescer.size)
+
+        yield self.http_client.fetch(self.get_url('/customers?s=customer4'))
+        self.assertEqual(1, self.coalescer.cache_hits)
+
+    @gen_test
+    def test_write_invalidates_cache(self):
+        yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+        yield self.http_client.fetch(self.get_url('/customers'), method='POST', body='email=customer9@test.dev&total=5')
+
+        response = yield self.http_client.fetch(self.get_url('/customers?s=customer'))
+
+        self.assertEqual(2, self.storage.queries['search'])
+        self.assertEqual(6, len(json.loads(response.body.decode('utf-8'))))
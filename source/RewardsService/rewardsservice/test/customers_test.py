@@ -1,6 +1,8 @@
-from tornado.testing import gen_test
+import json
+
+from tornado.options import options
+from tornado.web import HTTPError
 from rewardsservice.test.runtests import BaseTestCases
-from pymongo import MongoClient
 
 
 class CustomersAPITestCase(BaseTestCases.APIResponseTestCase):
@@ -52,12 +54,10 @@ class CustomersAPITestCase(BaseTestCases.APIResponseTestCase):
         }
     }
 
-    @gen_test
     def test_get_all(self):
         response = self.fetch()
         self.assertEqual(200, response.code)
 
-    @gen_test
     def test_search(self):
         response = self.fetch({'s': 'customer'})
         self.assertEqual(200, response.code)
@@ -68,11 +68,7 @@ class CustomersAPITestCase(BaseTestCases.APIResponseTestCase):
     def setUp(self):
         super().setUp()
 
-        client = MongoClient("mongodb", 27017)
-        db = client["Customers"]
-
-        print("Loading customer test data in mongo")
-        db.customers.insert_many([
+        for customer in [
             {
                 "email": "customer1@test.dev",
                 "points": 480, "tier": "D",
@@ -161,18 +157,8 @@ class CustomersAPITestCase(BaseTestCases.APIResponseTestCase):
                 "nextTier": "H",
                 "rewardName": "35% off purchase"
             }
-        ])
-        print("Test customer data loaded in mongo")
-
-        client.close()
-
-    def tearDown(self):
-        super().tearDown()
-
-        client = MongoClient("mongodb", 27017)
-        db = client["Customers"]
-
-        db.customers.delete_many({'email': {'$regex': '.*\@test\.dev'}})
+        ]:
+            self.storage.save_customer(customer)
 
 
 class CustomersAPIErrorTestCase(BaseTestCases.APIErrorTestCase):
@@ -233,10 +219,63 @@ class CustomersRewardsTestCase(BaseTestCases.APIResponseTestCase):
 
         self._tests = tests
 
-    def tearDown(self):
-        super().tearDown()
 
-        client = MongoClient("mongodb", 27017)
-        db = client["Customers"]
+class CustomersLookupTestCase(BaseTestCases.APITestCase):
+    _http_method = 'POST'
+    _api_endpoint = '/customers/lookup'
+
+    def setUp(self):
+        super().setUp()
+
+        for email, total in [('customer1@test.dev', 480), ('customer2@test.dev', 120)]:
+            self.storage.upsert_customer(email, total)
+
+    def test_lookup(self):
+        response = self.fetch([('email', 'customer1@test.dev'), ('email', 'missing@test.dev'),
+                               ('email', 'customer2@test.dev')])
+
+        self.assertResponse(response, 200, {
+            'customer1@test.dev': self.storage.get_customer('customer1@test.dev'),
+            'missing@test.dev': None,
+            'customer2@test.dev': self.storage.get_customer('customer2@test.dev'),
+        })
+
+    def test_lookup_json(self):
+        body = json.dumps({'emails': ['customer2@test.dev', 'customer2@test.dev']})
+        response = self.fetch(body=body, headers={'Content-Type': 'application/json'})
+
+        self.assertResponse(response, 200, {'customer2@test.dev': self.storage.get_customer('customer2@test.dev')})
+
+    def test_lookup_invalid_email(self):
+        response = self.fetch([('email', 'customer1@test.dev'), ('email', 'invalid@email')])
+
+        self.assertEqual(400, response.code)
+        message = str(HTTPError(400, 'Invalid parameter email'))
+        self.assertEqual(message, self.fetch_body(response, 'error')['message'])
+
+    def test_lookup_json_not_strings(self):
+        message = str(HTTPError(400, 'Invalid parameter email'))
+
+        for emails in ([['customer1@test.dev']], [{'email': 'customer1@test.dev'}], ['customer1@test.dev', 1]):
+            response = self.fetch(body=json.dumps({'emails': emails}), headers={'Content-Type': 'application/json'})
+
+            self.assertEqual(400, response.code)
+            self.assertEqual(message, self.fetch_body(response, 'error')['message'])
+
+    def test_lookup_too_many(self):
+        emails = [('email', 'customer%d@test.dev' % i) for i in range(options.lookup_max_emails + 1)]
+        response = self.fetch(emails)
+
+        self.assertEqual(400, response.code)
+
+    def test_lookup_too_many_checked_first(self):
+        body = json.dumps({'emails': [[]] * (options.lookup_max_emails + 1)})
+        response = self.fetch(body=body, headers={'Content-Type': 'application/json'})
+
+        message = str(HTTPError(400, 'Too many emails, at most %d per lookup' % options.lookup_max_emails))
+        self.assertEqual(message, self.fetch_body(response, 'error')['message'])
+
+    def test_lookup_get_not_allowed(self):
+        response = self.fetch(method='GET')
 
-        db.customers.delete_many({'email': {'$regex': '.*\@test\.dev'}})
+        self.assertEqual(405, response.code)
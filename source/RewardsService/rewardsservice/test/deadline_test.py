@@ -0,0 +1,154 @@
+import datetime
+import time
+
+from unittest import mock
+
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.options import options
+from tornado.test.util import unittest
+
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.deadline import DEADLINE_HEADER, Deadline, DeadlineExceeded
+from rewardsservice.expiry import PointsExpiry
+from rewardsservice.test.runtests import BaseTestCases
+
+
+class SlowStorageClient(MemoryStorageClient):
+    ''' Customer lookups honour the deadline the way mongo's maxTimeMS does, listings ignore it entirely '''
+
+    delay = 1.0
+
+    def get_customer(self, email, primary=False):
+        time.sleep(min(self.delay, self.deadline.remaining()))
+
+        if not self.deadline.remaining():
+            raise DeadlineExceeded()
+
+        return super().get_customer(email, primary)
+
+    def list_customers(self):
+        time.sleep(self.delay)
+
+        return super().list_customers()
+
+
+class TimedOutWriteStorageClient(MemoryStorageClient):
+    ''' Writes bound to a request are applied but time out before they're acknowledged, like a slow mongo write '''
+
+    def save_customer(self, customer):
+        super().save_customer(customer)
+
+        if self.deadline:
+            raise DeadlineExceeded(ambiguous=True)
+
+    def delete_customer(self, email):
+        super().delete_customer(email)
+
+        if self.deadline:
+            raise DeadlineExceeded(ambiguous=True)
+
+
+class DeadlineTestCase(unittest.TestCase):
+    def request(self, timeout=None):
+        headers = HTTPHeaders({DEADLINE_HEADER: timeout} if timeout is not None else {})
+
+        return HTTPServerRequest('GET', '/customers', headers=headers)
+
+    def test_default_timeout(self):
+        self.assertAlmostEqual(options.request_timeout, Deadline.from_request(self.request()).remaining(), 1)
+        self.assertAlmostEqual(options.request_timeout, Deadline.from_request(self.request('soon')).remaining(), 1)
+
+    def test_header_shortens_timeout(self):
+        self.assertAlmostEqual(0.25, Deadline.from_request(self.request('250')).remaining(), 1)
+
+    def test_header_cannot_extend_timeout(self):
+        timeout = str(int(options.request_timeout * 2000))
+        self.assertAlmostEqual(options.request_timeout, Deadline.from_request(self.request(timeout)).remaining(), 1)
+
+    def test_header_not_positive_ignored(self):
+        for timeout in ('0', '-250'):
+            self.assertAlmostEqual(options.request_timeout, Deadline.from_request(self.request(timeout)).remaining(), 1)
+
+    def test_exhausted(self):
+        deadline = Deadline(0)
+
+        self.assertEqual(0, deadline.remaining())
+        self.assertRaises(DeadlineExceeded, deadline.max_time_ms)
+
+
+class CustomersDeadlineTestCase(BaseTestCases.APITestCase):
+    def get_storage(self):
+        return SlowStorageClient(customers=[{'email': 'customer1@test.dev', 'points': 100}])
+
+    def timed_fetch(self, params=None, timeout=None):
+        headers = {DEADLINE_HEADER: str(timeout)} if timeout else {}
+
+        started = time.monotonic()
+        response = self.fetch(params, headers=headers)
+
+        return response, time.monotonic() - started
+
+    def test_lookup_deadline(self):
+        response, elapsed = self.timed_fetch({'email': 'customer1@test.dev'}, 100)
+
+        self.assertEqual(504, response.code)
+        self.assertLess(elapsed, 0.5)
+
+    def test_listing_deadline(self):
+        response, elapsed = self.timed_fetch(timeout=100)
+
+        self.assertEqual(504, response.code)
+        self.assertLess(elapsed, 0.5)
+
+    def test_default_deadline(self):
+        with mock.patch.object(options.mockable(), 'request_timeout', 0.1):
+            response, elapsed = self.timed_fetch({'email': 'customer1@test.dev'})
+
+        self.assertEqual(504, response.code)
+        self.assertLess(elapsed, 0.5)
+
+    def test_within_deadline(self):
+        self.storage.delay = 0.05
+        response, elapsed = self.timed_fetch({'email': 'customer1@test.dev'}, 1000)
+
+        self.assertEqual(200, response.code)
+        self.assertEqual(100, self.fetch_body(response, 'points'))
+
+
+class CustomersAmbiguousWriteTestCase(BaseTestCases.APITestCase):
+    def get_storage(self):
+        return TimedOutWriteStorageClient(customers=[{'email': 'customer1@test.dev', 'points': 100}])
+
+    def get_expiry(self):
+        return PointsExpiry(MemoryStorageClient(), 30)
+
+    def setUp(self):
+        super().setUp()
+
+        self.published = []
+        self.events.subscribe(lambda event, customer: self.published.append((event, customer)))
+
+    def test_timed_out_update_not_accrued(self):
+        with mock.patch.object(self.coalescer, 'forget') as forget:
+            response = self.fetch({'email': 'customer2@test.dev', 'total': 250}, method='PUT')
+
+        self.assertEqual(504, response.code)
+        forget.assert_called_once_with('customers')
+        self.assertEqual(['customer2@test.dev'], self.email_index.suggest('customer2'))
+        self.assertEqual([('refresh', {'email': 'customer2@test.dev'})], self.published)
+
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime.utcnow() + datetime.timedelta(days=63)))
+
+    def test_timed_out_delete_keeps_expiry(self):
+        self.email_index.add('customer1@test.dev')
+        self.expiry.storage.upsert_customer('customer1@test.dev', 100)
+        self.expiry.accrue('customer1@test.dev', 100)
+
+        response = self.fetch({'email': 'customer1@test.dev'}, method='DELETE')
+
+        self.assertEqual(504, response.code)
+        self.assertEqual([], self.email_index.suggest('customer1'))
+        self.assertEqual([('refresh', {'email': 'customer1@test.dev'})], self.published)
+
+        count, _ = self.expiry.sweep(datetime.datetime.utcnow() + datetime.timedelta(days=63))
+        self.assertEqual(1, count)
@@ -0,0 +1,65 @@
+from tornado.test.util import unittest
+
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.email_index import EmailIndex
+from rewardsservice.test.runtests import BaseTestCases
+
+EMAILS = ['bob@test.dev', 'alice@test.dev', 'alfred@test.dev', 'al@test.dev', 'amy@test.dev']
+
+
+class EmailIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = EmailIndex(EMAILS)
+
+    def test_suggest(self):
+        self.assertEqual(['al@test.dev', 'alfred@test.dev', 'alice@test.dev'], self.index.suggest('al'))
+        self.assertEqual(['alice@test.dev'], self.index.suggest('ali', 10))
+        self.assertEqual(['al@test.dev'], self.index.suggest('a', 1))
+        self.assertEqual([], self.index.suggest('c'))
+        self.assertEqual([], self.index.suggest(''))
+
+    def test_add_and_remove(self):
+        self.index.add('alan@test.dev')
+        self.index.add('alan@test.dev')
+        self.index.remove('alice@test.dev')
+        self.index.remove('nobody@test.dev')
+
+        self.assertEqual(5, self.index.size)
+        self.assertEqual(['al@test.dev', 'alan@test.dev', 'alfred@test.dev'], self.index.suggest('al'))
+
+    def test_from_storage(self):
+        storage = MemoryStorageClient()
+
+        for email in EMAILS:
+            storage.upsert_customer(email, 100)
+
+        self.assertEqual(sorted(EMAILS)[:4], EmailIndex.from_storage(storage).suggest('a', 10))
+
+
+class CustomersSuggestTestCase(BaseTestCases.APITestCase):
+    _api_endpoint = '/customers/suggest'
+
+    def setUp(self):
+        super().setUp()
+
+        for email in EMAILS:
+            self.email_index.add(email)
+
+    def test_suggest(self):
+        response = self.fetch({'prefix': 'al', 'limit': 2})
+
+        self.assertEqual(200, response.code)
+        self.assertEqual(['al@test.dev', 'alfred@test.dev'], self.fetch_body(response))
+
+    def test_invalid_limit(self):
+        self.assertEqual(400, self.fetch({'prefix': 'al', 'limit': 'many'}).code)
+        self.assertEqual(400, self.fetch({'prefix': 'al', 'limit': 0}).code)
+
+    def test_writes_update_index(self):
+        self.storage.upsert_customer('alice@test.dev', 100)
+
+        self._api_endpoint = '/customers'
+        self.fetch({'email': 'alex@test.dev', 'total': 10}, method='POST')
+        self.fetch({'email': 'alice@test.dev'}, method='DELETE')
+
+        self.assertEqual(['al@test.dev', 'alex@test.dev', 'alfred@test.dev'], self.email_index.suggest('al'))
@@ -0,0 +1,67 @@
+import json
+
+from tornado.concurrent import Future
+from tornado.testing import gen_test
+
+from rewardsservice.test.runtests import BaseTestCases
+
+
+class CustomerEventsTestCase(BaseTestCases.APITestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.storage.upsert_customer('customer1@test.dev', 120)
+
+    def listen(self, count):
+        ''' Open the event stream and resolve with the first count events once they arrive '''
+        received = []
+        events = Future()
+
+        def on_chunk(chunk):
+            for message in chunk.decode('utf-8').split('\n\n'):
+                lines = dict(l.split(': ', 1) for l in message.split('\n') if l.startswith(('event', 'data')))
+
+                if 'event' in lines:
+                    received.append((lines['event'], json.loads(lines['data'])))
+
+            if len(received) >= count and not events.done():
+                events.set_result(received)
+
+        self.http_client.fetch(self.get_url('/customers/events'), streaming_callback=on_chunk, raise_error=False)
+
+        return events
+
+    def write_customer(self, method, body):
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+        return self.http_client.fetch(self.get_url('/customers'), method=method, body=body, headers=headers)
+
+    def wait_for_subscriber(self):
+        while not self.events.subscribers:
+            yield self.http_client.fetch(self.get_url('/rewards'))
+
+    @gen_test
+    def test_update_and_delete_events(self):
+        events = self.listen(3)
+        yield from self.wait_for_subscriber()
+
+        yield self.write_customer('PUT', 'email=customer1@test.dev&total=100')
+        yield self.write_customer('POST', 'email=customer2@test.dev&total=5')
+        yield self.http_client.fetch(self.get_url('/customers?email=customer1@test.dev'), method='DELETE')
+
+        events = yield events
+
+        self.assertEqual(['update', 'update', 'delete'], [e[0] for e in events])
+        self.assertEqual(220, events[0][1]['points'])
+        self.assertEqual('customer2@test.dev', events[1][1]['email'])
+        self.assertEqual('customer1@test.dev', events[2][1]['email'])
+
+    @gen_test
+    def test_failed_write_not_published(self):
+        events = []
+        self.events.subscribe(lambda *event: events.append(event))
+
+        yield self.http_client.fetch(self.get_url('/customers?email=missing@test.dev'), method='DELETE',
+                                     raise_error=False)
+
+        self.assertEqual([], events)
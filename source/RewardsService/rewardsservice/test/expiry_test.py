@@ -0,0 +1,142 @@
+import datetime
+
+from unittest import mock
+
+from tornado.testing import AsyncTestCase, gen_test
+
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.expiry import PointsExpiry
+from rewardsservice.test.runtests import BaseTestCases
+
+JANUARY = datetime.datetime(2026, 1, 15, 12, 30)
+FEBRUARY = datetime.datetime(2026, 2, 3)
+
+
+class PointsExpiryTestCase(AsyncTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.storage = MemoryStorageClient()
+        self.expiry = PointsExpiry(self.storage, 30, batch_size=2)
+
+    def earn(self, email, points, now):
+        self.storage.increment_customer(email, points)
+        self.expiry.accrue(email, points, now=now)
+
+    def test_bucket(self):
+        self.assertEqual(('2026-01', datetime.datetime(2026, 3, 3)), self.expiry.bucket(JANUARY))
+        self.assertEqual(('2026-12', datetime.datetime(2027, 1, 31)),
+                         self.expiry.bucket(datetime.datetime(2026, 12, 31)))
+
+    def test_sweep_expires_buckets(self):
+        self.earn('customer1@test.dev', 300, JANUARY)
+        self.earn('customer1@test.dev', 150, FEBRUARY)
+
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime(2026, 3, 2)))
+
+        count, customers = self.expiry.sweep(datetime.datetime(2026, 3, 3))
+
+        self.assertEqual(1, count)
+        self.assertEqual([self.storage.get_customer('customer1@test.dev')], customers)
+        self.assertEqual(150, customers[0]['points'])
+        self.assertEqual('A', customers[0]['tier'])
+
+    def test_sweep_reads_from_primary(self):
+        self.earn('customer1@test.dev', 300, JANUARY)
+
+        with mock.patch.object(self.storage, 'get_customers', wraps=self.storage.get_customers) as get_customers:
+            self.expiry.sweep(datetime.datetime(2026, 3, 3))
+
+        get_customers.assert_called_once_with(['customer1@test.dev'], primary=True)
+
+    def test_sweep_only_claims_expired_buckets(self):
+        for i in range(5):
+            self.earn('customer%d@test.dev' % i, 100, JANUARY if i < 3 else FEBRUARY)
+
+        self.assertEqual(2, self.expiry.sweep(datetime.datetime(2026, 3, 10))[0])
+        self.assertEqual(1, self.expiry.sweep(datetime.datetime(2026, 3, 10))[0])
+        self.assertEqual(0, self.expiry.sweep(datetime.datetime(2026, 3, 10))[0])
+
+        self.assertEqual([0, 0, 0, 100, 100], [c['points'] for c in self.storage.list_customers()])
+
+    def test_failed_sweep_released(self):
+        self.earn('customer1@test.dev', 300, JANUARY)
+        self.earn('customer1@test.dev', 150, FEBRUARY)
+
+        with mock.patch.object(self.storage, 'save_customers', side_effect=RuntimeError('write failed')):
+            self.assertRaises(RuntimeError, self.expiry.sweep, datetime.datetime(2026, 3, 3))
+
+        self.assertEqual(450, self.storage.get_customer('customer1@test.dev')['points'])
+
+        self.assertEqual(1, self.expiry.sweep(datetime.datetime(2026, 3, 3))[0])
+        self.assertEqual(150, self.storage.get_customer('customer1@test.dev')['points'])
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime(2026, 3, 3)))
+
+    def test_buckets_deleted_after_save(self):
+        self.earn('customer1@test.dev', 300, JANUARY)
+
+        calls = mock.Mock()
+        calls.save_customers.side_effect = self.storage.save_customers
+        calls.delete_claimed_accruals.side_effect = self.storage.delete_claimed_accruals
+
+        with mock.patch.object(self.storage, 'save_customers', calls.save_customers), \
+                mock.patch.object(self.storage, 'delete_claimed_accruals', calls.delete_claimed_accruals):
+            self.expiry.sweep(datetime.datetime(2026, 3, 3))
+
+        self.assertEqual(['save_customers', 'delete_claimed_accruals'], [c[0] for c in calls.mock_calls])
+
+    def test_replace_then_accrue_same_month(self):
+        for _ in range(2):
+            self.storage.upsert_customer('customer1@test.dev', 300)
+            self.expiry.accrue('customer1@test.dev', 300, replace=True, now=JANUARY)
+
+        self.earn('customer1@test.dev', 200, FEBRUARY)
+
+        count, customers = self.expiry.sweep(datetime.datetime(2026, 3, 5))
+
+        self.assertEqual(1, count)
+        self.assertEqual(200, customers[0]['points'])
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime(2026, 3, 5)))
+
+    def test_replace_and_forget(self):
+        self.earn('customer1@test.dev', 300, JANUARY)
+        self.storage.upsert_customer('customer2@test.dev', 50)
+        self.expiry.accrue('customer1@test.dev', 50, replace=True, now=FEBRUARY)
+        self.expiry.accrue('customer2@test.dev', 50, now=JANUARY)
+        self.expiry.forget('customer2@test.dev')
+
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime(2026, 3, 10)))
+        self.assertEqual(1, self.expiry.sweep(datetime.datetime(2026, 4, 1))[0])
+
+    @gen_test
+    def test_sweep_all(self):
+        for i in range(5):
+            self.earn('customer%d@test.dev' % i, 100, JANUARY)
+
+        updated = []
+        yield self.expiry.sweep_all(updated.extend, now=datetime.datetime(2026, 4, 1))
+
+        self.assertEqual(5, len(updated))
+        self.assertTrue(all(c['points'] == 0 for c in updated))
+
+
+class CustomersExpiryTestCase(BaseTestCases.APITestCase):
+    def get_expiry(self):
+        return PointsExpiry(self.storage, 30)
+
+    def test_points_expire(self):
+        response = self.fetch({'email': 'customer1@test.dev', 'total': 250}, method='PUT')
+        self.assertEqual(250, self.fetch_body(response, 'points'))
+
+        count, customers = self.expiry.sweep(datetime.datetime.utcnow() + datetime.timedelta(days=63))
+        self.assertEqual(1, count)
+
+        response = self.fetch({'email': 'customer1@test.dev'})
+        self.assertEqual(0, self.fetch_body(response, 'points'))
+        self.assertIsNone(self.fetch_body(response, 'tier'))
+
+    def test_deleted_customer_points_forgotten(self):
+        self.fetch({'email': 'customer1@test.dev', 'total': 250}, method='PUT')
+        self.fetch({'email': 'customer1@test.dev'}, method='DELETE')
+
+        self.assertEqual((0, []), self.expiry.sweep(datetime.datetime.utcnow() + datetime.timedelta(days=63)))
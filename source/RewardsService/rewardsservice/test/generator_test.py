@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+from unittest import mock
+
+from pymongo.errors import BulkWriteError
+from tornado.test.util import unittest
+
+import generate_customer_data
+from generate_customer_data import (DuplicateCustomersError, generate, generate_batch, generate_customers,
+                                    generate_rewards, parse_args)
+
+
+class GenerateCustomerDataTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rewards = generate_rewards(5)
+
+    def fixture(self, directory, name, *argv):
+        path = os.path.join(directory, name)
+        generate(parse_args(['--host', '', '-n', '250', '-b', '40', '-t', '5', '-o', path] + list(argv)))
+
+        with open(path) as fixture:
+            return fixture.read()
+
+    def test_batch_deterministic(self):
+        batch = generate_batch(42, 3, 100, 1000, self.rewards)
+
+        self.assertEqual(batch, generate_batch(42, 3, 100, 1000, self.rewards))
+        self.assertNotEqual(batch, generate_batch(7, 3, 100, 1000, self.rewards))
+
+    def test_last_batch_truncated(self):
+        self.assertEqual(50, len(generate_batch(0, 9, 100, 950, self.rewards)))
+
+    def test_fixture_independent_of_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            single = self.fixture(directory, 'single.jsonl', '-w', '1', '-s', '42')
+            several = self.fixture(directory, 'several.jsonl', '-w', '3', '-s', '42')
+            other_seed = self.fixture(directory, 'other.jsonl', '-w', '3', '-s', '7')
+
+        self.assertEqual(251, len(single.splitlines()))
+        self.assertEqual(single, several)
+        self.assertNotEqual(single, other_seed)
+
+    def test_fixture_independent_of_batch_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            small = self.fixture(directory, 'small.jsonl', '-b', '40')
+            large = self.fixture(directory, 'large.jsonl', '-b', '250')
+
+        self.assertEqual(small, large)
+
+    def test_customers_independent_of_block(self):
+        customers = generate_customers(42, 0, 2500, self.rewards)
+
+        self.assertEqual(customers[900:1700], generate_customers(42, 900, 1700, self.rewards))
+        self.assertEqual(customers[:250], generate_batch(42, 0, 250, 2500, self.rewards))
+
+    def test_discount_capped(self):
+        names = [reward['rewardName'] for reward in generate_rewards(26)]
+
+        self.assertEqual('5% off purchase', names[0])
+        self.assertEqual('95% off purchase', names[18])
+        self.assertEqual('95% off purchase', names[-1])
+
+    def test_duplicate_customers(self):
+        collection = mock.MagicMock()
+        collection.insert_many.side_effect = BulkWriteError({'writeErrors': [{'code': 11000}], 'nInserted': 39})
+
+        client = {'Customers': {'customers': collection}}
+
+        with mock.patch.dict(generate_customer_data._worker, client=client):
+            with self.assertRaisesRegex(DuplicateCustomersError, '1 of 40 .* --drop'):
+                generate_customer_data._insert(generate_batch(0, 0, 40, 40, self.rewards))
+
+    def test_other_bulk_errors_raised(self):
+        collection = mock.MagicMock()
+        collection.insert_many.side_effect = BulkWriteError({'writeErrors': [{'code': 121}], 'nInserted': 39})
+
+        customers = generate_batch(0, 0, 40, 40, self.rewards)
+
+        with mock.patch.dict(generate_customer_data._worker, client={'Customers': {'customers': collection}}):
+            self.assertRaises(BulkWriteError, generate_customer_data._insert, customers)
@@ -8,13 +8,24 @@ from tornado.test.util import unittest
 from tornado.web import Application, HTTPError
 from tornado.httpclient import HTTPResponse
 
-from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.testing import AsyncHTTPTestCase
 
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.coalescer import Coalescer
+from rewardsservice.email_index import EmailIndex
+from rewardsservice.events import CustomerEvents
 from rewardsservice.settings import settings
 from rewardsservice.url_patterns import url_patterns
 
 TEST_MODULES = [
-    'rewardsservice.test.customers_test'
+    'rewardsservice.test.coalescing_test',
+    'rewardsservice.test.customers_test',
+    'rewardsservice.test.deadline_test',
+    'rewardsservice.test.events_test',
+    'rewardsservice.test.email_index_test',
+    'rewardsservice.test.expiry_test',
+    'rewardsservice.test.generator_test',
+    'rewardsservice.test.storage_test',
 ]
 
 
@@ -29,7 +40,23 @@ class BaseTestCases:
         _api_endpoint = '/customers'
 
         def get_app(self):
-            return Application(url_patterns, **settings)
+            self.storage = self.get_storage()
+            self.coalescer = self.get_coalescer()
+            self.events = CustomerEvents()
+            self.expiry = self.get_expiry()
+            self.email_index = EmailIndex()
+
+            return Application(url_patterns, storage=self.storage, coalescer=self.coalescer, events=self.events,
+                               expiry=self.expiry, email_index=self.email_index, **settings)
+
+        def get_storage(self):
+            return MemoryStorageClient()
+
+        def get_coalescer(self):
+            return Coalescer()
+
+        def get_expiry(self):
+            return None
 
         def assertResponse(self, response, expected_code, expected_body, msg=''):
             self.assertIsInstance(response, HTTPResponse, 'Not a valid response')
@@ -65,13 +92,11 @@ class BaseTestCases:
                     kwargs['headers'] = {'Content-Type': 'application/x-www-form-urlencoded'}
                     kwargs['body'] = urlencode(params)
 
-            self.http_client.fetch(self.get_url(path), self.stop, **kwargs)
-            return self.wait()
+            return AsyncHTTPTestCase.fetch(self, path, raise_error=False, **kwargs)
 
     class APIResponseTestCase(APITestCase):
         _tests = None
 
-        @gen_test()
         def test_requests(self, tests=None):
             tests = tests or self._tests
             for (msg, test) in tests.items():
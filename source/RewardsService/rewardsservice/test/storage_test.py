@@ -0,0 +1,179 @@
+import datetime
+
+from unittest import mock
+
+from pymongo import _csot
+from pymongo.collection import Collection
+from pymongo.errors import ExecutionTimeout, NetworkTimeout, OperationFailure, ServerSelectionTimeoutError
+from pymongo.read_preferences import Nearest, Primary, SecondaryPreferred
+from tornado.test.util import unittest
+
+from rewardsservice.clients.memory_client import MemoryStorageClient
+from rewardsservice.clients.mongo_client import MongoStorageClient
+from rewardsservice.deadline import Deadline, DeadlineExceeded
+from rewardsservice.rewards import DEFAULT_REWARDS
+
+
+class MemoryStorageClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.storage = MemoryStorageClient()
+
+        for email, total in [('bob@test.dev', 120), ('alice@test.dev', 480), ('alfred@test.dev', 50)]:
+            self.storage.upsert_customer(email, total)
+
+    def test_list_sorted_by_email(self):
+        emails = [c['email'] for c in self.storage.list_customers()]
+        self.assertEqual(['alfred@test.dev', 'alice@test.dev', 'bob@test.dev'], emails)
+
+    def test_search(self):
+        self.assertEqual(['alice@test.dev'], [c['email'] for c in self.storage.search_customers('lic')])
+
+    def test_prefix_search(self):
+        emails = [c['email'] for c in self.storage.search_customers('al', prefix=True)]
+        self.assertEqual(['alfred@test.dev', 'alice@test.dev'], emails)
+        self.assertEqual([], self.storage.search_customers('lic', prefix=True))
+
+    def test_increment(self):
+        customer = self.storage.increment_customer('bob@test.dev', 100)
+
+        self.assertEqual(220, customer['points'])
+        self.assertEqual('B', customer['tier'])
+        self.assertEqual(customer, self.storage.get_customer('bob@test.dev'))
+
+    def test_delete(self):
+        self.assertEqual(480, self.storage.delete_customer('alice@test.dev')['points'])
+        self.assertIsNone(self.storage.get_customer('alice@test.dev'))
+        self.assertIsNone(self.storage.delete_customer('alice@test.dev'))
+        self.assertEqual(2, len(self.storage.list_customers()))
+
+    def test_returns_copies(self):
+        self.storage.get_customer('bob@test.dev')['points'] = 0
+        self.assertEqual(120, self.storage.get_customer('bob@test.dev')['points'])
+
+
+class MongoStorageClientTestCase(unittest.TestCase):
+    def setUp(self):
+        ''' connect=False keeps pymongo from looking for a server, find is mocked out in the tests that query '''
+        self.storage = MongoStorageClient('mongodb://localhost:27017/?replicaSet=rs0',
+                                          customers_read_preference='secondaryPreferred',
+                                          rewards_read_preference='nearest', max_staleness=120, connect=False)
+
+    def tearDown(self):
+        self.storage.close()
+
+    def assertReadPreference(self, expected, method, *args):
+        with mock.patch.object(Collection, 'find', autospec=True, return_value=[]) as find:
+            getattr(self.storage, method)(*args)
+
+        self.assertEqual(expected, find.call_args[0][0].read_preference)
+
+    def test_customers_read_preference(self):
+        self.assertReadPreference(SecondaryPreferred(max_staleness=120), 'list_customers')
+        self.assertReadPreference(SecondaryPreferred(max_staleness=120), 'search_customers', 'customer')
+
+    def test_rewards_read_preference(self):
+        self.assertReadPreference(Nearest(max_staleness=120), 'list_rewards')
+
+    def test_lookups_read_from_primary(self):
+        self.assertReadPreference(Primary(), 'get_customers', ['customer1@test.dev'])
+
+    def test_writes_read_from_primary(self):
+        storage = MongoStorageClient(lookup_read_preference='secondaryPreferred', max_staleness=120, connect=False)
+        self.addCleanup(storage.close)
+
+        with mock.patch.object(Collection, 'find', autospec=True, return_value=[dict(r) for r in DEFAULT_REWARDS]), \
+                mock.patch.object(Collection, 'find_one', autospec=True, return_value=None) as find_one, \
+                mock.patch.object(Collection, 'replace_one', autospec=True):
+            storage.get_customer('customer1@test.dev')
+            storage.increment_customer('customer1@test.dev', 100)
+
+        self.assertEqual([SecondaryPreferred(max_staleness=120), Primary()],
+                         [c[0][0].read_preference for c in find_one.call_args_list])
+
+    def test_accruals_read_from_primary(self):
+        storage = MongoStorageClient(lookup_read_preference='secondaryPreferred', max_staleness=120, connect=False)
+        self.addCleanup(storage.close)
+
+        with mock.patch.object(Collection, 'find', autospec=True, side_effect=[[{'_id': 1}], []]) as find, \
+                mock.patch.object(Collection, 'update_many', autospec=True):
+            storage.claim_expired_accruals(datetime.datetime(2026, 3, 3), 10)
+
+        self.assertEqual([Primary(), Primary()], [c[0][0].read_preference for c in find.call_args_list])
+
+    def test_invalid_max_staleness(self):
+        for max_staleness in (0, 30, -5):
+            with self.assertRaises(ValueError):
+                MongoStorageClient(customers_read_preference='secondary', max_staleness=max_staleness, connect=False)
+
+    def test_claim_and_delete_accruals(self):
+        claimed = [{'_id': i, 'email': 'customer%d@test.dev' % i, 'points': 100, 'claim': 'claim1'} for i in (1, 2)]
+
+        with mock.patch('rewardsservice.clients.mongo_client.ObjectId', return_value='claim1'), \
+                mock.patch.object(Collection, 'find', autospec=True, side_effect=[[{'_id': 1}, {'_id': 2}], claimed]), \
+                mock.patch.object(Collection, 'update_many', autospec=True) as update_many:
+            accruals = self.storage.claim_expired_accruals(datetime.datetime(2026, 3, 3), 10)
+
+        self.assertEqual(claimed, accruals)
+        self.assertEqual({'$in': [1, 2]}, update_many.call_args[0][1]['_id'])
+        self.assertEqual('claim1', update_many.call_args[0][2]['$set']['claim'])
+
+        with mock.patch.object(Collection, 'delete_many', autospec=True) as delete_many:
+            self.storage.delete_claimed_accruals(accruals)
+
+        delete_many.assert_called_once_with(mock.ANY, {'_id': {'$in': [1, 2]}, 'claim': 'claim1'})
+
+    def test_deadline_timeout(self):
+        ''' pymongo derives maxTimeMS and the socket timeouts from the timeout the call runs under '''
+        storage = self.storage.bind(Deadline(5))
+        timeouts = []
+
+        def record(*args, **kwargs):
+            timeouts.append(_csot.get_timeout())
+            return []
+
+        with mock.patch.object(Collection, 'find', autospec=True, side_effect=record), \
+                mock.patch.object(Collection, 'replace_one', autospec=True, side_effect=record):
+            storage.list_customers()
+            storage.save_customer({'email': 'customer1@test.dev', 'points': 100})
+
+        self.assertEqual(2, len(timeouts))
+        self.assertTrue(all(4 < t <= 5 for t in timeouts))
+
+    def test_deadline_exceeded(self):
+        storage = self.storage.bind(Deadline(0))
+
+        with mock.patch.object(Collection, 'find', autospec=True, return_value=[]) as find:
+            self.assertRaises(DeadlineExceeded, storage.list_customers)
+
+        self.assertFalse(find.called)
+
+    def test_mongo_timeout(self):
+        with mock.patch.object(Collection, 'find', autospec=True, side_effect=ExecutionTimeout('timed out')):
+            with self.assertRaises(DeadlineExceeded) as raised:
+                self.storage.list_rewards()
+
+        self.assertFalse(raised.exception.ambiguous)
+
+    def test_write_timeout_ambiguous(self):
+        with mock.patch.object(Collection, 'replace_one', autospec=True, side_effect=NetworkTimeout('timed out')):
+            with self.assertRaises(DeadlineExceeded) as raised:
+                self.storage.save_customer({'email': 'customer1@test.dev', 'points': 100})
+
+        self.assertTrue(raised.exception.ambiguous)
+
+    def test_server_selection_timeout_not_ambiguous(self):
+        error = ServerSelectionTimeoutError('no primary')
+
+        with mock.patch.object(Collection, 'replace_one', autospec=True, side_effect=error):
+            with self.assertRaises(DeadlineExceeded) as raised:
+                self.storage.save_customer({'email': 'customer1@test.dev', 'points': 100})
+
+        self.assertFalse(raised.exception.ambiguous)
+
+    def test_other_errors_raised(self):
+        with mock.patch.object(Collection, 'replace_one', autospec=True, side_effect=OperationFailure('failed')):
+            self.assertRaises(OperationFailure, self.storage.save_customer, {'email': 'customer1@test.dev'})
+
+    def test_unknown_read_preference(self):
+        with self.assertRaises(ValueError):
+            MongoStorageClient(customers_read_preference='secondaryOnly', connect=False)
@@ -1,7 +1,14 @@
 from rewardsservice.handlers.rewards_handler import RewardsHandler
-from rewardsservice.handlers.customers_handler import CustomersHandler
+from rewardsservice.handlers.customers_handler import CustomersHandler, CustomersLookupHandler, \
+    CustomersSuggestHandler
+from rewardsservice.handlers.events_handler import CustomerEventsHandler
+from rewardsservice.handlers.metrics_handler import MetricsHandler
 
 url_patterns = [
     (r'/rewards', RewardsHandler),
     (r'/customers', CustomersHandler),
+    (r'/customers/lookup', CustomersLookupHandler),
+    (r'/customers/suggest', CustomersSuggestHandler),
+    (r'/customers/events', CustomerEventsHandler),
+    (r'/metrics', MetricsHandler),
 ]
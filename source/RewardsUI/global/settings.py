@@ -118,3 +118,11 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/1.11/howto/static-files/
 
 STATIC_URL = '/static/'
+
+
+# Rewards service
+
+REWARDS_SERVICE_URL = 'http://rewardsservice:7050'
+
+# Seconds a dashboard page may spend on rewards service calls, passed to the service as its deadline
+REWARDS_SERVICE_TIMEOUT = 5.0
@@ -0,0 +1,43 @@
+import time
+
+import requests
+
+DEADLINE_HEADER = 'X-Request-Timeout-Ms'
+
+
+class RewardsServiceClient(object):
+    '''
+    Client for the rewards service where every call made through one instance shares a single deadline.
+
+    Each call gets what's left of the budget as its requests timeout and passes it on in the deadline header, so the
+    service stops working on calls we've given up on.
+    '''
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url
+        self.deadline = time.monotonic() + timeout
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def get(self, path, **params):
+        remaining = self.remaining()
+
+        if remaining <= 0:
+            raise requests.Timeout('Deadline exceeded before calling %s' % path)
+
+        response = requests.get(
+            self.base_url + path,
+            params=params,
+            headers={DEADLINE_HEADER: str(int(remaining * 1000))},
+            timeout=remaining
+        )
+        response.raise_for_status()
+
+        return response.json()
+
+    def get_rewards(self):
+        return self.get('/rewards')
+
+    def get_customers(self, search=''):
+        return self.get('/customers', s=search)
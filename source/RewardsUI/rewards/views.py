@@ -1,9 +1,12 @@
 import logging
 import requests
 
+from django.conf import settings
 from django.template.response import TemplateResponse
 from django.views.generic.base import TemplateView
 
+from .clients.rewards_service_client import RewardsServiceClient
+
 
 class RewardsView(TemplateView):
     template_name = 'index.html'
@@ -14,17 +17,24 @@ class RewardsView(TemplateView):
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(**kwargs)
 
-        response = requests.get("http://rewardsservice:7050/rewards")
-        context['rewards_data'] = response.json()
-
         search = request.GET.get('s', '')
         context['search_term'] = search
 
-        response = requests.get("http://rewardsservice:7050/customers?s=%s" % search)
-        context['customers_data'] = response.json()
+        # Both calls share one deadline, so a slow service can't hold the page for longer than the timeout
+        client = RewardsServiceClient(
+            getattr(settings, 'REWARDS_SERVICE_URL', 'http://rewardsservice:7050'),
+            getattr(settings, 'REWARDS_SERVICE_TIMEOUT', 5.0)
+        )
+
+        try:
+            context['rewards_data'] = client.get_rewards()
+            context['customers_data'] = client.get_customers(search)
+        except requests.RequestException as e:
+            self.logger.error('Rewards service request failed: %s', e)
+            context['error'] = 'The rewards service is not responding, please try again.'
 
         return TemplateResponse(
             request,
             self.template_name,
             context
-        )
\ No newline at end of file
+        )